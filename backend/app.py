@@ -1,10 +1,10 @@
+import asyncio
 import uvicorn
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from sentence_transformers import SentenceTransformer
-from const.env_variables import EMBEDDING_MODEL_NAME
+from const.env_variables import EMBEDDING_WARMUP, RERANK_ENABLED
 
 from controllers.qdrant_controller import router as vector_database_controller
 from controllers.config_controller import router as config_controller
@@ -13,6 +13,15 @@ from controllers.files_controller import router as files_controller
 from controllers.chat_controller import router as chat_controller
 from controllers.jobs_controller import router as jobs_controller
 
+from services.ingestionService import ingestion_service
+from services.deletionService import deletion_service
+from services.openAiService import open_ai_service
+from services.httpClients import http_clients
+from services.embeddingProviders import embedding_providers
+from services.embeddingServer import stop_embedding_servers
+from services.sparseEmbeddings import warmup_sparse_models
+from services.rerankService import reranker
+
 app = FastAPI(
     title="RAG API",
     description="API for Retrieval-Augmented Generation operations",
@@ -38,6 +47,49 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def start_ingestion() -> None:
+    ingestion_service.start()
+    deletion_service.start()
+
+
+@app.on_event("shutdown")
+def stop_ingestion() -> None:
+    ingestion_service.shutdown()
+    deletion_service.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_openai_client() -> None:
+    await open_ai_service.close()
+
+
+@app.on_event("startup")
+async def open_http_clients() -> None:
+    await http_clients.startup()
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    await http_clients.shutdown()
+
+
+@app.on_event("startup")
+async def warm_embedding_models() -> None:
+    if EMBEDDING_WARMUP:
+        await embedding_providers.warmup()
+        await asyncio.to_thread(warmup_sparse_models)
+        if RERANK_ENABLED:
+            try:
+                await asyncio.to_thread(reranker.warmup)
+            except Exception as e:
+                print(f"Reranker warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+def stop_embedding_server_threads() -> None:
+    stop_embedding_servers()
+
+
 if __name__ == "__main__":
-    SentenceTransformer(EMBEDDING_MODEL_NAME)
     uvicorn.run("app:app", host="0.0.0.0", port=8080, reload=True)
@@ -21,4 +21,99 @@ QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
 QDRANT_URL = os.getenv("QDRANT_URL", f"http://{QDRANT_HOST}:{QDRANT_PORT}")
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "rag_collection")
 QDRANT_RECREATE_ON_MISMATCH = os.getenv("QDRANT_RECREATE_ON_MISMATCH", "true").lower() == "true"
-VECTOR_SIZE = os.getenv('VECTOR_SIZE', 768)
\ No newline at end of file
+VECTOR_SIZE = os.getenv('VECTOR_SIZE', 768)
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+QDRANT_UPSERT_BATCH_POINTS = int(os.getenv("QDRANT_UPSERT_BATCH_POINTS", 256))
+QDRANT_UPSERT_BATCH_BYTES = int(os.getenv("QDRANT_UPSERT_BATCH_BYTES", 8 * 1024 * 1024))
+QDRANT_UPSERT_MAX_IN_FLIGHT = int(os.getenv("QDRANT_UPSERT_MAX_IN_FLIGHT", 4))
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+INGESTION_MAX_CONCURRENT_JOBS = int(os.getenv("INGESTION_MAX_CONCURRENT_JOBS", 4))
+INGESTION_FILES_PER_JOB = int(os.getenv("INGESTION_FILES_PER_JOB", 2))
+INGESTION_FILES_PER_WORKER = int(os.getenv("INGESTION_FILES_PER_WORKER", 2))
+INGESTION_RESUME_ON_STARTUP = os.getenv("INGESTION_RESUME_ON_STARTUP", "true").lower() == "true"
+INGESTION_MAX_WORKER_CRASHES = int(os.getenv("INGESTION_MAX_WORKER_CRASHES", 2))
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", 30.0))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 120.0))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 4))
+OPENAI_MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", 16))
+
+OPENAI_EMBEDDING_MAX_TOKENS_PER_BATCH = int(os.getenv("OPENAI_EMBEDDING_MAX_TOKENS_PER_BATCH", 50000))
+OPENAI_EMBEDDING_MAX_IN_FLIGHT = int(os.getenv("OPENAI_EMBEDDING_MAX_IN_FLIGHT", 4))
+OPENAI_EMBEDDING_BATCH_RETRIES = int(os.getenv("OPENAI_EMBEDDING_BATCH_RETRIES", 2))
+
+CACHE_DIR = os.path.join(UPLOAD_DIR, ".cache")
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite3"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 500000))
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 2048))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", 3600))
+
+INGESTION_CHUNK_WINDOW = int(os.getenv("INGESTION_CHUNK_WINDOW", 256))
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", max(1, (os.cpu_count() or 2) // INGESTION_WORKERS)))
+PARSE_PAGES_PER_TASK = int(os.getenv("PARSE_PAGES_PER_TASK", 25))
+PARSE_FILE_TIMEOUT = float(os.getenv("PARSE_FILE_TIMEOUT", 600))
+
+CHAT_FAST_PATH_AUTO = os.getenv("CHAT_FAST_PATH_AUTO", "false").lower() == "true"
+CHAT_FAST_PATH_MAX_IN_FLIGHT = int(os.getenv("CHAT_FAST_PATH_MAX_IN_FLIGHT", 8))
+
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", 32))
+OLLAMA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", 16))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", 60.0))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 120.0))
+OLLAMADB_BASE_URL = os.getenv("OLLAMADB_BASE_URL", "https://ollamadb.dev")
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+OLLAMA_EMBED_BATCH_SIZE = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", 64))
+OLLAMA_EMBED_MAX_IN_FLIGHT = int(os.getenv("OLLAMA_EMBED_MAX_IN_FLIGHT", 2))
+OLLAMA_EMBED_BATCH_RETRIES = int(os.getenv("OLLAMA_EMBED_BATCH_RETRIES", 2))
+COLLECTION_SETTINGS_PATH = os.getenv("COLLECTION_SETTINGS_PATH", os.path.join(UPLOAD_DIR, ".collections.json"))
+
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+EMBEDDING_WARMUP_BATCH_SIZE = int(os.getenv("EMBEDDING_WARMUP_BATCH_SIZE", 8))
+EMBEDDING_MODEL_MMAP = os.getenv("EMBEDDING_MODEL_MMAP", "true").lower() == "true"
+EMBEDDING_MODEL_MMAP_DIR = os.getenv("EMBEDDING_MODEL_MMAP_DIR", os.path.join(CACHE_DIR, "models"))
+EMBEDDING_SERVER_MAX_BATCH = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", 128))
+EMBEDDING_SERVER_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", 5))
+
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 0)) or None
+QDRANT_COLLECTION_PROFILE = os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+
+STORE_DIR = os.path.join(UPLOAD_DIR, ".store")
+CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH", os.path.join(STORE_DIR, "chunks.sqlite3"))
+CHUNK_STORE_COMPRESSION_LEVEL = int(os.getenv("CHUNK_STORE_COMPRESSION_LEVEL", 6))
+FILE_CATALOG_PATH = os.getenv("FILE_CATALOG_PATH", os.path.join(STORE_DIR, "catalog.sqlite3"))
+COLLECTION_STATS_PATH = os.getenv("COLLECTION_STATS_PATH", os.path.join(STORE_DIR, "stats.sqlite3"))
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", 100))
+
+QDRANT_HYBRID = os.getenv("QDRANT_HYBRID", "false").lower() == "true"
+SPARSE_EMBEDDING_MODEL = os.getenv("SPARSE_EMBEDDING_MODEL", "Qdrant/bm25")
+SPARSE_EMBED_BATCH_SIZE = int(os.getenv("SPARSE_EMBED_BATCH_SIZE", 256))
+FASTEMBED_CACHE_DIR = os.getenv("FASTEMBED_CACHE_DIR", os.path.join(CACHE_DIR, "fastembed"))
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "rrf").lower()
+HYBRID_PREFETCH_LIMIT = int(os.getenv("HYBRID_PREFETCH_LIMIT", 50))
+
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", 32))
+RERANK_OVERFETCH = int(os.getenv("RERANK_OVERFETCH", 4))
+RERANK_MAX_CANDIDATES = int(os.getenv("RERANK_MAX_CANDIDATES", 50))
+RERANK_MAX_IN_FLIGHT = int(os.getenv("RERANK_MAX_IN_FLIGHT", 2))
+RERANK_SEARCH_BUDGET_MS = float(os.getenv("RERANK_SEARCH_BUDGET_MS", 200))
+RERANK_CHAT_BUDGET_MS = float(os.getenv("RERANK_CHAT_BUDGET_MS", 400))
+RERANK_CACHE_MAX_ENTRIES = int(os.getenv("RERANK_CACHE_MAX_ENTRIES", 50000))
+RERANK_CACHE_TTL_SECONDS = float(os.getenv("RERANK_CACHE_TTL_SECONDS", 3600))
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", os.path.join(CACHE_DIR, "answers.sqlite3"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 86400))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 10000))
+ANSWER_CACHE_SCAN_LIMIT = int(os.getenv("ANSWER_CACHE_SCAN_LIMIT", 500))
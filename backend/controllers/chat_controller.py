@@ -1,118 +1,234 @@
 import os
+import json
+import time
+import asyncio
+from typing import List, Dict, Tuple, Any, AsyncIterator, Callable
 from fastapi import HTTPException, APIRouter
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
 
-from services.qdrantService import QdrantService
+from services.qdrantService import qdrant_service, sparse_query_vector
 from services.openAiService import open_ai_service
+from services.ollamaService import ollama_service
 
-from helpers.embeding_helper import embed_texts, embed_texts_openai
+from services.embeddingProviders import embed_query, get_embedding_provider
+from services.rerankService import reranker
 
 from qdrant_client import models as qmodels
 
 from models.openai_response import OpenAIChatRequest
 
-from const.env_variables import QDRANT_COLLECTION
+from const.env_variables import QDRANT_COLLECTION, CHAT_FAST_PATH_AUTO, CHAT_FAST_PATH_MAX_IN_FLIGHT, RERANK_ENABLED, RERANK_CHAT_BUDGET_MS
 from const.variables import qdrant_limit
 
 from helpers.files_helper import load_prompt
+from helpers.answer_cache import answer_cache, answer_scope
 
 router = APIRouter(
     prefix=""
 )
 
+_rag_chats_in_flight = 0
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def _answer_cache_key(request: OpenAIChatRequest, messages: List[Dict[str, str]], fast_path: bool) -> Tuple[str, str, List[str]]:
+    """
+    The latest question, its answer-cache scope and the checksums the answer depends on.
+
+    The rest of the conversation is part of the scope, so a follow-up
+    question only hits answers given after the same exchange. So are the
+    retrieval settings, so an answer is only reused for the same search mode
+    and reranking.
+    """
+    last = max((idx for idx, m in enumerate(messages) if m.get("role") == "user"), default=None)
+    if last is None:
+        raise HTTPException(status_code=400, detail="No user message found for RAG search.")
+    checksums = [doc.checksum_sha256 for doc in request.documents]
+    rerank = RERANK_ENABLED if request.rerank is None else request.rerank
+    scope = answer_scope(
+        request.model,
+        get_embedding_provider(QDRANT_COLLECTION).cache_key,
+        checksums,
+        messages[:last] + messages[last + 1:],
+        "fast" if fast_path else "judged",
+        {
+            "search_mode": request.search_mode or "auto",
+            "rerank": rerank,
+            "rerank_budget_ms": (RERANK_CHAT_BUDGET_MS if request.rerank_budget_ms is None else request.rerank_budget_ms) if rerank else None,
+        },
+    )
+    return messages[last]["content"], scope, checksums
+
+async def _prepare_rag_messages(request: OpenAIChatRequest, messages: List[Dict[str, str]], timings: Dict[str, float]) -> Tuple[list, List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Embed the latest user message, retrieve matching chunks from the selected
+    documents and build the prompt messages. With reranking, candidates are
+    over-fetched and the cross-encoder picks the chunks that go into the prompt.
+
+    Returns:
+        Tuple of (search hits, messages without context, messages with context).
+    """
+    user_messages = [m for m in messages if m.get("role") == "user"]
+    if not user_messages:
+        raise HTTPException(status_code=400, detail="No user message found for RAG search.")
+    query = user_messages[-1]["content"]
+
+    must_conditions = []
+    for doc in request.documents:
+        must_conditions.append(
+            qmodels.FieldCondition(
+                key="checksum_sha256",
+                match=qmodels.MatchValue(value=doc.checksum_sha256)
+            )
+        )
+    filter_condition = qmodels.Filter(
+        should=must_conditions
+    ) if must_conditions else None
+
+    stage = time.perf_counter()
+    try:
+        query_vec, sparse_vec = await asyncio.gather(
+            embed_query(query),
+            sparse_query_vector(query, QDRANT_COLLECTION, request.search_mode),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    timings["embed_ms"] = _elapsed_ms(stage)
+
+    rerank = RERANK_ENABLED if request.rerank is None else request.rerank
+
+    stage = time.perf_counter()
+    search_results = await asyncio.to_thread(
+        qdrant_service.search,
+        query_vec,
+        collection_name=QDRANT_COLLECTION,
+        limit=reranker.candidates(qdrant_limit) if rerank else qdrant_limit,
+        query_filter=filter_condition,
+        sparse_vector=sparse_vec,
+    )
+    timings["retrieval_ms"] = _elapsed_ms(stage)
+
+    docs = await asyncio.to_thread(qdrant_service.hydrate, search_results)
+
+    if rerank:
+        stage = time.perf_counter()
+        search_results, docs, _, rerank_info = await reranker.rerank(
+            query, search_results, docs, qdrant_limit,
+            RERANK_CHAT_BUDGET_MS if request.rerank_budget_ms is None else request.rerank_budget_ms,
+        )
+        timings["rerank_ms"] = _elapsed_ms(stage)
+        if rerank_info.get("skipped"):
+            timings["rerank_skipped"] = rerank_info["skipped"]
+
+    context_chunks = []
+    for payload in docs:
+        if payload and "chunk_text" in payload:
+            text_to_append = f"""
+                =========================
+                filename: {payload["filename"]}
+                page_number: {payload["page_number"]}
+                source_type: {payload["source_type"]}
+                file_extension: {payload["file_extension"]}
+                upload_timestamp: {payload.get("upload_timestamp")}
+                chunk_word_count: {payload.get("chunk_word_count")}
+                chunk_text: {payload["chunk_text"]}
+                chunk_sentence_count: {payload.get("chunk_sentence_count")}
+                ========================="""
+            context_chunks.append(text_to_append)
+    context = "\n\n".join(context_chunks)
+
+    context_message = {
+        "role": "system",
+        "content": f"Relevant context from documents:\n{context}" if context else "No relevant context found."
+    }
+
+    rule_messge = {
+        "role": "user",
+        "content": f"Remember, if you don't have the information, say that you don't have the information. Remember to add also page number and source file in your response. It could be usefull for the user to know the source of the information. Always response in the same language as the user's message."
+    }
+
+    messages_without_context = [rule_messge] + messages
+
+    messages_with_context = [context_message] + messages_without_context
+
+    return search_results, messages_without_context, messages_with_context
+
 @router.post("/open_ai/chat", tags=["Chat"])
 async def open_ai_chat(request: OpenAIChatRequest):
+    global _rag_chats_in_flight
     try:
         messages = [message.dict() for message in request.messages]
         
         if request.documents:
-            user_messages = [m for m in messages if m.get("role") == "user"]
-            if not user_messages:
-                raise HTTPException(status_code=400, detail="No user message found for RAG search.")
-            query = user_messages[-1]["content"]
-
-            must_conditions = []
-            for doc in request.documents:
-                must_conditions.append(
-                    qmodels.FieldCondition(
-                        key="checksum_sha256",
-                        match=qmodels.MatchValue(value=doc.checksum_sha256)
+            started = time.perf_counter()
+            timings = {}
+            fast_path = request.fast_path
+            if fast_path is None:
+                # Opt-in unless the deployment enables switching to it under load.
+                fast_path = CHAT_FAST_PATH_AUTO and _rag_chats_in_flight >= CHAT_FAST_PATH_MAX_IN_FLIGHT
+
+            # Near-identical questions about the same documents are answered from the cache.
+            stage = time.perf_counter()
+            query, scope, checksums = _answer_cache_key(request, messages, fast_path)
+            query_vec = await embed_query(query)
+            cached = await asyncio.to_thread(answer_cache.get, scope, query_vec)
+            timings["answer_cache_ms"] = _elapsed_ms(stage)
+            if cached is not None:
+                timings["total_ms"] = _elapsed_ms(started)
+                return {"response": cached["response"], "fast_path": fast_path, "cached": True, "similarity": cached["similarity"], "timings": timings}
+
+            search_results, messages_without_context, messages_with_context = await _prepare_rag_messages(request, messages, timings)
+
+            _rag_chats_in_flight += 1
+            try:
+                stage = time.perf_counter()
+                if fast_path:
+                    response = await open_ai_service.query_model(
+                        model=request.model,
+                        messages=messages_with_context,
                     )
-                )
-            filter_condition = qmodels.Filter(
-                should=must_conditions
-            ) if must_conditions else None
-
-            [query_vec] = await embed_texts_openai([query])
-
-            client = QdrantService.ensure_qdrant_ready(use_openai=True)
-
-            search_params = {
-                "collection_name": QDRANT_COLLECTION,
-                "query_vector": query_vec,
-                "limit": qdrant_limit,
-                "with_payload": True,
-            }
-            if filter_condition:
-                search_params["query_filter"] = filter_condition
-
-            search_results = client.search(**search_params)
-
-            context_chunks = []
-            for hit in search_results:
-                payload = hit.payload
-                if payload and "chunk_text" in payload:
-                    text_to_append = f"""
-                        =========================
-                        filename: {payload["filename"]}
-                        page_number: {payload["page_number"]}
-                        source_type: {payload["source_type"]}
-                        file_extension: {payload["file_extension"]}
-                        upload_timestamp: {payload["upload_timestamp"]}
-                        chunk_word_count: {payload["chunk_word_count"]}
-                        chunk_text: {payload["chunk_text"]}
-                        chunk_sentence_count: {payload["chunk_sentence_count"]}
-                        ========================="""
-                    context_chunks.append(text_to_append)
-            context = "\n\n".join(context_chunks)
-
-            context_message = {
-                "role": "system",
-                "content": f"Relevant context from documents:\n{context}" if context else "No relevant context found."
-            }
-
-            rule_messge = {
-                "role": "user",
-                "content": f"Remember, if you don't have the information, say that you don't have the information. Remember to add also page number and source file in your response. It could be usefull for the user to know the source of the information. Always response in the same language as the user's message."
-            }
-
-            messages_without_context = [rule_messge] + messages
-
-            messages_with_context = [context_message] + messages_without_context
-
-            response_without_context = await open_ai_service.query_model(
-                model=request.model,
-                messages=messages_without_context,
-            )
+                    timings["generation_ms"] = _elapsed_ms(stage)
+                    response = jsonable_encoder(response)
+                    await asyncio.to_thread(answer_cache.put, scope, query, query_vec, checksums, response)
+                    timings["total_ms"] = _elapsed_ms(started)
+                    return {"response": response, "fast_path": True, "cached": False, "timings": timings}
 
-            response = await open_ai_service.query_model(
-                model=request.model,
-                messages=messages_with_context,
-            )
+                # The baseline and the grounded answer are independent, so generate them concurrently.
+                response_without_context, response = await asyncio.gather(
+                    open_ai_service.query_model(
+                        model=request.model,
+                        messages=messages_without_context,
+                    ),
+                    open_ai_service.query_model(
+                        model=request.model,
+                        messages=messages_with_context,
+                    ),
+                )
+                timings["generation_ms"] = _elapsed_ms(stage)
 
-            judge_prompt = load_prompt("llm_as_a_judge_prompt.md")
-            # Should return decision, if the response with context is ok or no. If no, return the reason why.
-            judge_response = await open_ai_service.query_model(
-                model=request.model,
-                messages=[{
-                    "role": "system",
-                    "content": judge_prompt
-                }, {
-                    "role": "user",
-                    "content": f"Response: {response}\n\nResponse without context: {response_without_context}"
-                }]
-            )
+                judge_prompt = load_prompt("llm_as_a_judge_prompt.md")
+                # Should return decision, if the response with context is ok or no. If no, return the reason why.
+                stage = time.perf_counter()
+                judge_response = await open_ai_service.query_model(
+                    model=request.model,
+                    messages=[{
+                        "role": "system",
+                        "content": judge_prompt
+                    }, {
+                        "role": "user",
+                        "content": f"Response: {response}\n\nResponse without context: {response_without_context}"
+                    }]
+                )
+                timings["judge_ms"] = _elapsed_ms(stage)
+                judge_response = jsonable_encoder(judge_response)
+                await asyncio.to_thread(answer_cache.put, scope, query, query_vec, checksums, judge_response)
+                timings["total_ms"] = _elapsed_ms(started)
+            finally:
+                _rag_chats_in_flight -= 1
 
-            return {"response": judge_response}
+            return {"response": judge_response, "fast_path": False, "cached": False, "timings": timings}
         else:
             response = await open_ai_service.query_model(
                 model=request.model,
@@ -121,3 +237,102 @@ async def open_ai_chat(request: OpenAIChatRequest):
             return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenAI chat failed: {str(e)}")
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _source_from_hit(hit) -> Dict[str, Any]:
+    payload = hit.payload or {}
+    return {
+        "id": str(hit.id),
+        "score": hit.score,
+        "filename": payload.get("filename"),
+        "checksum_sha256": payload.get("checksum_sha256"),
+        "page_number": payload.get("page_number"),
+        "chunk_index": payload.get("chunk_index"),
+        "source_type": payload.get("source_type"),
+    }
+
+
+async def _stream_rag_chat(request: OpenAIChatRequest, open_stream: Callable[[List[Dict[str, str]]], AsyncIterator[str]]) -> StreamingResponse:
+    """
+    Retrieve context, then stream the grounded answer as Server-Sent Events.
+
+    Emits one `sources` event, then a `token` event per text delta, and a
+    final `done` (with timings) or `error` event. Tokens are pulled from the
+    provider only as fast as the client reads them; if the client goes away
+    Starlette cancels the response and the upstream stream is closed.
+    RAG streams count towards the chats in flight while they retrieve and
+    while they generate.
+    """
+    global _rag_chats_in_flight
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    messages = [message.dict() for message in request.messages]
+    sources: List[Dict[str, Any]] = []
+    prompt = messages
+    counted = bool(request.documents)
+    if counted:
+        _rag_chats_in_flight += 1
+        try:
+            search_results, _, prompt = await _prepare_rag_messages(request, messages, timings)
+        finally:
+            _rag_chats_in_flight -= 1
+        sources = [_source_from_hit(hit) for hit in search_results]
+
+    async def events() -> AsyncIterator[str]:
+        global _rag_chats_in_flight
+        if counted:
+            _rag_chats_in_flight += 1
+        tokens = open_stream(prompt)
+        try:
+            yield _sse("sources", sources)
+            stage = time.perf_counter()
+            async for delta in tokens:
+                if "first_token_ms" not in timings:
+                    timings["first_token_ms"] = _elapsed_ms(started)
+                yield _sse("token", {"delta": delta})
+            timings["generation_ms"] = _elapsed_ms(stage)
+            timings["total_ms"] = _elapsed_ms(started)
+            yield _sse("done", {"timings": timings})
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield _sse("error", {"detail": detail})
+        finally:
+            await tokens.aclose()
+            if counted:
+                _rag_chats_in_flight -= 1
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/open_ai/chat/stream", tags=["Chat"])
+async def open_ai_chat_stream(request: OpenAIChatRequest):
+    try:
+        return await _stream_rag_chat(
+            request,
+            lambda prompt: open_ai_service.stream_model(model=request.model, messages=prompt),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OpenAI chat stream failed: {str(e)}")
+
+
+@router.post("/ollama/chat/stream", tags=["Chat"])
+async def ollama_chat_stream(request: OpenAIChatRequest):
+    try:
+        return await _stream_rag_chat(
+            request,
+            lambda prompt: ollama_service.stream_chat({"model": request.model, "messages": prompt}),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ollama chat stream failed: {str(e)}")
@@ -1,7 +1,14 @@
+import asyncio
 from fastapi import HTTPException, APIRouter
 from services.qdrantService import QdrantService
-import httpx
-from const.env_variables import OLLAMA_BASE_URL, MODEL_NAME_VAL, OLLAMA_HOST, OLLAMA_PORT
+from helpers.embedding_cache import embedding_cache
+from helpers.query_cache import query_embedding_cache
+from services.httpClients import ollama_client
+from services.embeddingProviders import embedding_providers
+from services.embeddingServer import embedding_server_stats
+from services.rerankService import reranker
+from helpers.answer_cache import answer_cache
+from const.env_variables import MODEL_NAME_VAL, OLLAMA_HOST, OLLAMA_PORT
 
 qdrant_service = QdrantService(host=OLLAMA_HOST, port=OLLAMA_PORT)
 
@@ -25,26 +32,49 @@ async def health():
         - Status of the API
         - Qdrant connection status
         - Ollama connection status and available models
+        - Embedding model warm-up status
     """
     try:
         qdrant_collections = qdrant_service.get_collections()
         
         ollama_status = {"status": "unknown"}
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
-                if resp.status_code == 200:
-                    ollama_status = {"status": "connected", "models": [m["name"] for m in resp.json().get("models", [])]}
-                else:
-                    ollama_status = {"status": "error", "details": resp.text}
+            resp = await ollama_client().get("/api/tags", timeout=5.0)
+            if resp.status_code == 200:
+                ollama_status = {"status": "connected", "models": [m["name"] for m in resp.json().get("models", [])]}
+            else:
+                ollama_status = {"status": "error", "details": resp.text}
         except Exception as e:
             ollama_status = {"status": "error", "details": str(e)}
         
+        embedding_status = embedding_providers.readiness()
+
         return {
-            "status": "healthy" if ollama_status["status"] == "connected" else "degraded", 
+            "status": "healthy" if ollama_status["status"] == "connected" and embedding_status["ready"] else "degraded", 
             "qdrant": {"status": "connected", "collections": len(qdrant_collections)},
-            "ollama": ollama_status
+            "ollama": ollama_status,
+            "embedding": embedding_status
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
 
+
+@router.get("/cache/stats", tags=["Health"])
+async def cache_stats():
+    """
+    Report hit/miss statistics for the embedding caches.
+
+    Returns:
+        - In-process query embedding cache stats
+        - Shared chunk embedding cache stats
+        - Local embedding server micro-batching stats
+        - Cross-encoder rerank stats and score cache
+        - Semantic RAG answer cache stats
+    """
+    return {
+        "query_embeddings": query_embedding_cache.stats(),
+        "embeddings": await asyncio.to_thread(embedding_cache.stats),
+        "embedding_servers": embedding_server_stats(),
+        "rerank": reranker.stats(),
+        "answers": await asyncio.to_thread(answer_cache.stats),
+    }
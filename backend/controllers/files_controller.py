@@ -3,15 +3,18 @@ from fastapi import HTTPException, APIRouter
 from services.qdrantService import QdrantService
 import os
 import uuid
+import asyncio
 import mimetypes
-from typing import List, Dict, Any
-from fastapi import HTTPException, UploadFile, BackgroundTasks
+from typing import List, Dict, Any, Optional
+from fastapi import HTTPException, UploadFile, Query
 from fastapi.responses import FileResponse
 from services.qdrantService import QdrantService
 from helpers.files_helper import list_saved_files, sha256_stream_to_tmp, storage_path_for_checksum, remove_file_by_checksum_and_filename
-from helpers.job_helper import  write_job, process_job
+from helpers.file_catalog import file_catalog, SORTABLE_COLUMNS
+from services.ingestionService import ingestion_service
+from services.deletionService import deletion_service
 from const.env_variables import  QDRANT_HOST, QDRANT_PORT, UPLOAD_DIR
-from fastapi import Body
+from fastapi import Body, Form
 from pydantic import BaseModel
 
 class DeleteFileRequest(BaseModel):
@@ -19,6 +22,10 @@ class DeleteFileRequest(BaseModel):
     filename: str
 
 
+class BulkDeleteRequest(BaseModel):
+    checksums: List[str]
+
+
 qdrant_service = QdrantService(host=QDRANT_HOST, port=QDRANT_PORT)
 
 router = APIRouter(
@@ -26,7 +33,10 @@ router = APIRouter(
 )
 
 @router.post("/upload", tags=["Files"])
-async def upload(files: List[UploadFile], background_tasks: BackgroundTasks) -> Dict[str, Any]:
+async def upload(
+    files: List[UploadFile],
+    force_reindex: bool = Form(False, description="Re-chunk and re-embed files even if they are already indexed"),
+) -> Dict[str, Any]:
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
 
@@ -51,6 +61,10 @@ async def upload(files: List[UploadFile], background_tasks: BackgroundTasks) ->
             dedup = False
 
         ctype, _ = mimetypes.guess_type(f.filename)
+        await asyncio.to_thread(file_catalog.add_file, rel_path, checksum, f.filename, size_bytes, ctype)
+
+        already_indexed = dedup and not force_reindex and await asyncio.to_thread(qdrant_service.is_file_indexed, rel_path)
+
         saved_items.append({
             "filename": f.filename,
             "checksum_sha256": checksum,
@@ -58,12 +72,17 @@ async def upload(files: List[UploadFile], background_tasks: BackgroundTasks) ->
             "storage_key": rel_path,
             "content_type": ctype or "application/octet-stream",
             "deduplicated": dedup,
+            "already_indexed": already_indexed,
             "download_url": f"/files/{checksum}/{f.filename}/download",
         })
-        storage_keys_for_job.append(rel_path)
+        if not already_indexed:
+            storage_keys_for_job.append(rel_path)
+
+    if not storage_keys_for_job:
+        # Every file is already indexed: there is nothing to queue.
+        return {"job_id": None, "job_status": "skipped", "count": len(saved_items), "items": saved_items}
 
-    write_job(job_id, {"job_id": job_id, "status": "queued", "items": storage_keys_for_job})
-    background_tasks.add_task(process_job, job_id, storage_keys_for_job)
+    await asyncio.to_thread(ingestion_service.submit, job_id, storage_keys_for_job, force_reindex)
 
     return {"job_id": job_id, "job_status": "queued", "count": len(saved_items), "items": saved_items}
 
@@ -85,9 +104,10 @@ async def delete_file(
             status_code=400,
             detail=f"Missing required parameter(s): {', '.join(missing)}"
         )
-    removed = remove_file_by_checksum_and_filename(checksum, filename)
+    # Both block on disk, SQLite and Qdrant, so they run off the event loop like the bulk path.
+    removed = await asyncio.to_thread(remove_file_by_checksum_and_filename, checksum, filename)
     try:
-        deleted_points = qdrant_service.delete_points_by_checksum_and_filename(checksum, filename)
+        deleted_points = await asyncio.to_thread(qdrant_service.delete_points_by_checksum_and_filename, checksum, filename)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -101,10 +121,56 @@ async def delete_file(
     return {"status": "success", "message": f"File {filename} with checksum {checksum} deleted."}
 
 
+@router.post("/files/bulk-delete", tags=["Files"])
+async def bulk_delete_files(
+    body: BulkDeleteRequest = Body(...)
+) -> Dict[str, Any]:
+    """
+    Delete many documents by checksum in a background job.
+
+    Removes their Qdrant points, stored chunks and file blobs in batches;
+    poll `/jobs/{job_id}` for progress.
+    """
+    checksums = list(dict.fromkeys(c.strip().lower() for c in body.checksums if c and c.strip()))
+    if not checksums:
+        raise HTTPException(status_code=400, detail="No checksums provided")
+    invalid = [c for c in checksums if len(c) != 64 or any(ch not in "0123456789abcdef" for ch in c)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid SHA-256 checksum(s): {', '.join(invalid[:5])}")
+
+    job_id = str(uuid.uuid4())
+    await asyncio.to_thread(deletion_service.submit, job_id, checksums)
+    return {"job_id": job_id, "job_status": "queued", "count": len(checksums)}
+
+
 @router.get("/files", tags=["Files"])
-async def files_list():
-    items = list_saved_files()
-    return {"count": len(items), "items": items}
+async def files_list(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    sort_by: str = Query("created_at", description=f"One of: {', '.join(SORTABLE_COLUMNS)}"),
+    order: str = Query("desc", description="asc or desc"),
+    filename: Optional[str] = Query(None, description="Substring of the filename"),
+    checksum: Optional[str] = Query(None),
+    content_type: Optional[str] = Query(None),
+    job_status: Optional[str] = Query(None, description="queued, processing, completed or failed"),
+):
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    try:
+        total, items = await asyncio.to_thread(
+            list_saved_files,
+            limit=limit,
+            offset=offset,
+            sort_by=sort_by,
+            descending=order == "desc",
+            filename=filename,
+            checksum=checksum,
+            content_type=content_type,
+            job_status=job_status,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"count": len(items), "total": total, "limit": limit, "offset": offset, "items": items}
 
 @router.get("/files/{checksum}/{filename}/download", tags=["Files"])
 async def download_file(checksum: str, filename: str):
@@ -4,7 +4,8 @@ from services.qdrantService import QdrantService
 import httpx
 from fastapi.responses import StreamingResponse
 from models.model_pull_request import ModelPullRequest
-from const.env_variables import OLLAMA_BASE_URL, OLLAMA_HOST, OLLAMA_PORT, INIT_MODEL_NAME_VAL
+from const.env_variables import OLLAMA_HOST, OLLAMA_PORT, INIT_MODEL_NAME_VAL
+from services.httpClients import http_clients, ollama_client
 
 qdrant_service = QdrantService(host=OLLAMA_HOST, port=OLLAMA_PORT)
 
@@ -15,15 +16,15 @@ router = APIRouter(
 async def pull_model(INIT_MODEL_NAME_VAL: str = INIT_MODEL_NAME_VAL):
     """Pull a model with timeout handling"""
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/pull",
-                json={"name": INIT_MODEL_NAME_VAL}
-            )
-            if response.status_code != 200:
-                print(f"Failed to pull model {INIT_MODEL_NAME_VAL}: {response.text}")
-                return False
-            return True
+        response = await ollama_client().post(
+            "/api/pull",
+            json={"name": INIT_MODEL_NAME_VAL},
+            timeout=300.0,
+        )
+        if response.status_code != 200:
+            print(f"Failed to pull model {INIT_MODEL_NAME_VAL}: {response.text}")
+            return False
+        return True
     except httpx.TimeoutException:
         print(f"Timeout while pulling model {INIT_MODEL_NAME_VAL}")
         return False
@@ -50,7 +51,7 @@ async def search_model(
     Returns:
         List of models and metadata from https://ollamadb.dev/api/v1/models
     """
-    url = "https://ollamadb.dev/api/v1/models"
+    url = "/api/v1/models"
     params = {}
     if search is not None:
         params["search"] = search
@@ -72,15 +73,14 @@ async def search_model(
         params["skip"] = skip
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, params=params)
-            if resp.status_code == 200:
-                return resp.json()
-            else:
-                return {
-                    "status_code": resp.status_code,
-                    "error": resp.text
-                }
+        resp = await http_clients.get("ollamadb").get(url, params=params)
+        if resp.status_code == 200:
+            return resp.json()
+        else:
+            return {
+                "status_code": resp.status_code,
+                "error": resp.text
+            }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search models: {str(e)}")
 
@@ -104,7 +104,7 @@ async def pull_model_endpoint(
     Returns:
         Streaming JSON objects with pull progress, or a single JSON object if stream is false.
     """
-    url = f"{OLLAMA_BASE_URL}/api/pull"
+    url = "/api/pull"
     payload = {
         "model": model,
         "insecure": insecure,
@@ -112,19 +112,17 @@ async def pull_model_endpoint(
     }
 
     async def stream_response():
-        async with httpx.AsyncClient(timeout=None) as client:
-            async with client.stream("POST", url, json=payload) as response:
-                async for line in response.aiter_lines():
-                    if line.strip():
-                        yield line + "\n"
+        async with ollama_client().stream("POST", url, json=payload, timeout=None) as response:
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield line + "\n"
 
     try:
         if stream:
             return StreamingResponse(stream_response(), media_type="application/json")
         else:
-            async with httpx.AsyncClient(timeout=None) as client:
-                resp = await client.post(url, json=payload)
-                return resp.json()
+            resp = await ollama_client().post(url, json=payload, timeout=None)
+            return resp.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to pull model: {str(e)}")
 
@@ -138,13 +136,12 @@ async def get_models():
         List of available models
     """
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
-            if resp.status_code == 200:
-                models = resp.json()
-                return {"models": models.get("models", [])}
-            else:
-                raise HTTPException(status_code=resp.status_code, detail="Failed to get models from Ollama")
+        resp = await ollama_client().get("/api/tags")
+        if resp.status_code == 200:
+            models = resp.json()
+            return {"models": models.get("models", [])}
+        else:
+            raise HTTPException(status_code=resp.status_code, detail="Failed to get models from Ollama")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get models: {str(e)}")
 
@@ -179,11 +176,10 @@ async def model_status():
         Current model status
     """
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{OLLAMA_BASE_URL}/api/status")
-            if resp.status_code == 200:
-                return resp.json()
-            else:
-                return {"status": "unknown"}
+        resp = await ollama_client().get("/api/status")
+        if resp.status_code == 200:
+            return resp.json()
+        else:
+            return {"status": "unknown"}
     except Exception:
         return {"status": "unknown"}
@@ -1,15 +1,19 @@
+import asyncio
 from typing import Optional
 from fastapi import HTTPException, APIRouter, Body
 
-from models.collection import Collection
-from services.qdrantService import QdrantService
+from models.collection import Collection, CollectionProfile
+from services.qdrantService import QdrantService, FUSIONS, sparse_query_vector
 
 from qdrant_client import models as qmodels
 
-from helpers.embeding_helper import embed_texts, embed_texts_openai
+from services.embeddingProviders import embed_query, embedding_providers, PROVIDERS
+from services.collectionProfiles import make_profile, collection_profile, assign_profile
+from services.sparseEmbeddings import sparse_model, assign_sparse_model
+from services.rerankService import reranker
 
-from const.env_variables import  QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION
-from const.variables import qdrant_limit, scroll_limit
+from const.env_variables import  QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION, SPARSE_EMBEDDING_MODEL, RERANK_ENABLED, RERANK_SEARCH_BUDGET_MS
+from const.variables import qdrant_limit
 
 qdrant_service = QdrantService(host=QDRANT_HOST, port=QDRANT_PORT)
 
@@ -36,23 +40,92 @@ async def get_collections():
 async def create_collection(collection: Collection):
     """
     Create a new collection in Qdrant.
+
+    When `embedding_provider` is set, the collection is embedded with that
+    provider (and `embedding_model`, or the provider's default) and the vector
+    size defaults to the model's dimension; `dimensions` shortens OpenAI v3
+    vectors. `profile` selects a storage preset (default, scalar, binary,
+    product) whose HNSW and on-disk settings can be overridden. `hybrid`
+    (or an explicit `sparse_model`) adds sparse vectors for hybrid search.
     
     Args:
-        collection: Collection configuration including name and vector settings
+        collection: Collection configuration including name, vector, embedding and storage settings
         
     Returns:
         Success message with collection name
     """
     try:
+        spec = embedding_providers.spec(collection.name)
+        provider_cls = PROVIDERS.get(collection.embedding_provider or spec["provider"])
+        if provider_cls is None:
+            raise HTTPException(status_code=400, detail=f"Unknown embedding provider '{collection.embedding_provider}'. Available: {', '.join(PROVIDERS)}")
+        model = collection.embedding_model or (None if collection.embedding_provider else spec["model"])
+        try:
+            provider = provider_cls(model, collection.dimensions)
+            profile = make_profile(
+                collection.profile or collection_profile(collection.name)["name"],
+                hnsw_m=collection.hnsw_m,
+                hnsw_ef_construct=collection.hnsw_ef_construct,
+                on_disk=collection.on_disk,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        model_dim = await asyncio.to_thread(provider.dimension)
+        if collection.vector_size and collection.vector_size != model_dim:
+            raise HTTPException(status_code=400, detail=f"vector_size={collection.vector_size} does not match {provider.name} model '{provider.model}' ({model_dim})")
+
+        sparse = collection.sparse_model or (SPARSE_EMBEDDING_MODEL if collection.hybrid else None)
+
         qdrant_service.create_collection(
             collection_name=collection.name,
-            vector_size=collection.vector_size,
-            distance=collection.distance
+            vector_size=model_dim,
+            distance=collection.distance,
+            profile=profile,
+            sparse=sparse,
         )
-        return {"status": "success", "message": f"Collection {collection.name} created"}
+        embedding = embedding_providers.assign(collection.name, provider.name, provider.model, provider.dimensions)
+        assign_profile(collection.name, profile)
+        assign_sparse_model(collection.name, sparse)
+        return {"status": "success", "message": f"Collection {collection.name} created", "vector_size": model_dim, "embedding": embedding, "profile": profile, "sparse_model": sparse}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create collection: {str(e)}")
 
+
+@router.get("/collections/{collection_name}/embedding", tags=["Collections"])
+async def get_collection_embedding(collection_name: str):
+    """Embedding provider and model used for a collection's documents and queries."""
+    return {"collection": collection_name, "embedding": embedding_providers.spec(collection_name), "sparse_model": sparse_model(collection_name)}
+
+
+@router.get("/collections/{collection_name}/profile", tags=["Collections"])
+async def get_collection_profile(collection_name: str):
+    """Storage profile (quantization, on-disk vectors, HNSW) of a collection."""
+    return {"collection": collection_name, "profile": collection_profile(collection_name)}
+
+
+@router.put("/collections/{collection_name}/profile", tags=["Collections"])
+async def update_collection_profile(collection_name: str, body: CollectionProfile):
+    """
+    Switch an existing collection to another storage profile.
+
+    Qdrant re-indexes and (de)quantizes the stored vectors in the background,
+    so searches keep working while the change is applied.
+    """
+    try:
+        try:
+            profile = make_profile(body.profile, hnsw_m=body.hnsw_m, hnsw_ef_construct=body.hnsw_ef_construct, on_disk=body.on_disk)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await asyncio.to_thread(qdrant_service.update_collection_profile, collection_name, profile)
+        assign_profile(collection_name, profile)
+        return {"collection": collection_name, "profile": profile}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update collection profile: {str(e)}")
+
 @router.post("/search", tags=["Search"])
 async def search_post(
     query: str = Body(..., embed=True, min_length=1, description="Zapytanie tekstowe"),
@@ -61,9 +134,25 @@ async def search_post(
     checksum: Optional[str] = Body(None, embed=True, description="Zawęź do jednego dokumentu po checksumie"),
     filename: Optional[str] = Body(None, embed=True, description="Albo zawęź po nazwie pliku"),
     score_threshold: Optional[float] = Body(None, embed=True, description="Minimalny wynik podobieństwa, np. 0.35"),
+    ef: Optional[int] = Body(None, embed=True, ge=1, description="Szerokość przeszukiwania HNSW (hnsw_ef)"),
+    exact: Optional[bool] = Body(None, embed=True, description="Wyszukiwanie dokładne, z pominięciem indeksu"),
+    oversampling: Optional[float] = Body(None, embed=True, ge=1.0, description="Nadpróbkowanie kandydatów przy kwantyzacji"),
+    mode: Optional[str] = Body(None, embed=True, description="auto, dense albo hybrid (gęste + rzadkie wektory)"),
+    fusion: Optional[str] = Body(None, embed=True, description="Fuzja wyników hybrydowych: rrf albo dbsf"),
+    prefetch_limit: Optional[int] = Body(None, embed=True, ge=1, le=1000, description="Liczba kandydatów z każdej gałęzi wyszukiwania hybrydowego"),
+    rerank: Optional[bool] = Body(None, embed=True, description="Przeszereguj kandydatów cross-encoderem (domyślnie RERANK_ENABLED)"),
+    rerank_budget_ms: Optional[float] = Body(None, embed=True, ge=0, description="Budżet czasu na przeszeregowanie; po jego przekroczeniu zwracana jest kolejność z wyszukiwania"),
 ):
     try:
-        [query_vec] = await embed_texts_openai([query])
+        if fusion and fusion not in FUSIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown fusion '{fusion}'. Available: {', '.join(FUSIONS)}")
+        try:
+            query_vec, sparse_vec = await asyncio.gather(
+                embed_query(query, collection_name),
+                sparse_query_vector(query, collection_name, mode),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         must = []
         if checksum:
@@ -78,29 +167,38 @@ async def search_post(
             ))
         flt = qmodels.Filter(must=must) if must else None
 
-        client = QdrantService.ensure_qdrant_ready(use_openai=True)
-
-        hits = client.search(
-            collection_name=collection_name or QDRANT_COLLECTION,
-            query_vector=query_vec,
-            limit=top_k,
-            with_payload=True,
-            score_threshold=score_threshold 
-        ) if flt is None else client.search(
-            collection_name=collection_name or QDRANT_COLLECTION,
-            query_vector=query_vec,
-            limit=top_k,
-            with_payload=True,
-            filter=flt,
-            score_threshold=score_threshold
+        if rerank is None:
+            rerank = RERANK_ENABLED
+
+        hits = await asyncio.to_thread(
+            qdrant_service.search,
+            query_vec,
+            collection_name=collection_name,
+            limit=reranker.candidates(top_k) if rerank else top_k,
+            query_filter=flt,
+            score_threshold=score_threshold,
+            ef=ef,
+            exact=exact,
+            oversampling=oversampling,
+            sparse_vector=sparse_vec,
+            fusion=fusion,
+            prefetch_limit=prefetch_limit,
         )
 
+        docs = await asyncio.to_thread(qdrant_service.hydrate, hits)
+        rerank_scores, rerank_info = [None] * len(hits), None
+        if rerank:
+            hits, docs, rerank_scores, rerank_info = await reranker.rerank(
+                query, hits, docs, top_k,
+                RERANK_SEARCH_BUDGET_MS if rerank_budget_ms is None else rerank_budget_ms,
+            )
+
         results = []
-        for h in hits:
-            p = h.payload or {}
+        for h, p, rerank_score in zip(hits, docs, rerank_scores):
             results.append({
                 "id": getattr(h, "id", None),
                 "score": h.score,
+                "rerank_score": rerank_score,
                 "filename": p.get("filename"),
                 "storage_key": p.get("storage_key"),
                 "chunk_index": p.get("chunk_index"),
@@ -120,9 +218,13 @@ async def search_post(
         return {
             "collection": collection_name or QDRANT_COLLECTION,
             "query": query,
+            "mode": "hybrid" if sparse_vec is not None else "dense",
+            "rerank": rerank_info,
             "count": len(results),
             "results": results
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
@@ -132,56 +234,13 @@ async def get_metadata_stats(
 ):
     """
     Get metadata statistics about the documents in the collection.
+
+    Served from Qdrant count/facet queries and ingestion-maintained counters,
+    so the cost does not depend on the number of points.
     """
     try:
-        client = QdrantService.ensure_qdrant_ready(use_openai=True)
         collection = collection_name or QDRANT_COLLECTION
-        
-        scroll_res = client.scroll(
-            collection_name=collection,
-            with_payload=True,
-            with_vectors=False,
-            limit=scroll_limit
-        )
-        
-        points = scroll_res[0]
-        if not points:
-            return {"collection": collection, "stats": {"total_points": 0}}
-        
-        stats = {
-            "total_points": len(points),
-            "source_types": {},
-            "file_extensions": {},
-            "page_numbers": {},
-            "total_files": 0,
-            "unique_files": set()
-        }
-        
-        for point in points:
-            payload = point.payload or {}
-            
-            source_type = payload.get("source_type", "unknown")
-            stats["source_types"][source_type] = stats["source_types"].get(source_type, 0) + 1
-            
-            file_ext = payload.get("file_extension", "unknown")
-            stats["file_extensions"][file_ext] = stats["file_extensions"].get(file_ext, 0) + 1
-            
-            page_num = payload.get("page_number")
-            if page_num is not None:
-                stats["page_numbers"][str(page_num)] = stats["page_numbers"].get(str(page_num), 0) + 1
-            
-            checksum = payload.get("checksum_sha256")
-            filename = payload.get("filename")
-            if checksum and filename:
-                stats["unique_files"].add(f"{checksum}_{filename}")
-        
-        stats["total_files"] = len(stats["unique_files"])
-        del stats["unique_files"]
-    
-        if stats["page_numbers"]:
-            sorted_pages = sorted(stats["page_numbers"].keys(), key=int)
-            stats["page_numbers"] = {page: stats["page_numbers"][page] for page in sorted_pages}
-        
+        stats = await asyncio.to_thread(qdrant_service.collection_statistics, collection)
         return {
             "collection": collection,
             "stats": stats
@@ -189,6 +248,23 @@ async def get_metadata_stats(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get metadata stats: {str(e)}")
 
+
+@router.post("/metadata/stats/rebuild", tags=["Metadata"])
+async def rebuild_metadata_stats(
+    collection_name: Optional[str] = Body(None, embed=True)
+):
+    """
+    Recount the statistics counters from the collection's points.
+
+    Needed once for collections ingested before the counters existed.
+    """
+    try:
+        collection = collection_name or QDRANT_COLLECTION
+        counted = await asyncio.to_thread(qdrant_service.rebuild_statistics, collection)
+        return {"collection": collection, "counted_points": counted}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild metadata stats: {str(e)}")
+
 @router.post("/search/advanced", tags=["Search"])
 async def advanced_search(
     query: str = Body(..., embed=True, min_length=1, description="Zapytanie tekstowe"),
@@ -200,12 +276,28 @@ async def advanced_search(
     source_type: Optional[str] = Body(None, embed=True, description="Filtruj po typie źródła (pdf, word, powerpoint, txt, md)"),
     file_extension: Optional[str] = Body(None, embed=True, description="Filtruj po rozszerzeniu pliku"),
     score_threshold: Optional[float] = Body(None, embed=True, description="Minimalny wynik podobieństwa, np. 0.35"),
+    ef: Optional[int] = Body(None, embed=True, ge=1, description="Szerokość przeszukiwania HNSW (hnsw_ef)"),
+    exact: Optional[bool] = Body(None, embed=True, description="Wyszukiwanie dokładne, z pominięciem indeksu"),
+    oversampling: Optional[float] = Body(None, embed=True, ge=1.0, description="Nadpróbkowanie kandydatów przy kwantyzacji"),
+    mode: Optional[str] = Body(None, embed=True, description="auto, dense albo hybrid (gęste + rzadkie wektory)"),
+    fusion: Optional[str] = Body(None, embed=True, description="Fuzja wyników hybrydowych: rrf albo dbsf"),
+    prefetch_limit: Optional[int] = Body(None, embed=True, ge=1, le=1000, description="Liczba kandydatów z każdej gałęzi wyszukiwania hybrydowego"),
+    rerank: Optional[bool] = Body(None, embed=True, description="Przeszereguj kandydatów cross-encoderem (domyślnie RERANK_ENABLED)"),
+    rerank_budget_ms: Optional[float] = Body(None, embed=True, ge=0, description="Budżet czasu na przeszeregowanie; po jego przekroczeniu zwracana jest kolejność z wyszukiwania"),
 ):
     """
     Advanced search with metadata filtering capabilities.
     """
     try:
-        [query_vec] = await embed_texts_openai([query])
+        if fusion and fusion not in FUSIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown fusion '{fusion}'. Available: {', '.join(FUSIONS)}")
+        try:
+            query_vec, sparse_vec = await asyncio.gather(
+                embed_query(query, collection_name),
+                sparse_query_vector(query, collection_name, mode),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         must = []
         if checksum:
@@ -236,23 +328,38 @@ async def advanced_search(
             
         flt = qmodels.Filter(must=must) if must else None
 
-        client = QdrantService.ensure_qdrant_ready(use_openai=True)
+        if rerank is None:
+            rerank = RERANK_ENABLED
 
-        hits = client.search(
-            collection_name=collection_name or QDRANT_COLLECTION,
-            query_vector=query_vec,
-            limit=top_k,
-            with_payload=True,
-            filter=flt,
-            score_threshold=score_threshold
+        hits = await asyncio.to_thread(
+            qdrant_service.search,
+            query_vec,
+            collection_name=collection_name,
+            limit=reranker.candidates(top_k) if rerank else top_k,
+            query_filter=flt,
+            score_threshold=score_threshold,
+            ef=ef,
+            exact=exact,
+            oversampling=oversampling,
+            sparse_vector=sparse_vec,
+            fusion=fusion,
+            prefetch_limit=prefetch_limit,
         )
 
+        docs = await asyncio.to_thread(qdrant_service.hydrate, hits)
+        rerank_scores, rerank_info = [None] * len(hits), None
+        if rerank:
+            hits, docs, rerank_scores, rerank_info = await reranker.rerank(
+                query, hits, docs, top_k,
+                RERANK_SEARCH_BUDGET_MS if rerank_budget_ms is None else rerank_budget_ms,
+            )
+
         results = []
-        for h in hits:
-            p = h.payload or {}
+        for h, p, rerank_score in zip(hits, docs, rerank_scores):
             results.append({
                 "id": getattr(h, "id", None),
                 "score": h.score,
+                "rerank_score": rerank_score,
                 "filename": p.get("filename"),
                 "storage_key": p.get("storage_key"),
                 "chunk_index": p.get("chunk_index"),
@@ -268,6 +375,8 @@ async def advanced_search(
         return {
             "collection": collection_name or QDRANT_COLLECTION,
             "query": query,
+            "mode": "hybrid" if sparse_vec is not None else "dense",
+            "rerank": rerank_info,
             "count": len(results),
             "filters": {
                 "checksum": checksum,
@@ -279,5 +388,7 @@ async def advanced_search(
             },
             "results": results
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Advanced search failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from const.env_variables import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_SCAN_LIMIT,
+)
+
+
+def answer_scope(
+    model: str,
+    embedding_model: str,
+    checksums: Sequence[str],
+    history: Sequence[Dict[str, str]],
+    variant: str,
+    retrieval: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Exact part of an answer's cache key: chat model, query embedding model,
+    sorted document checksums, the conversation before the latest question,
+    the response variant and the retrieval settings (search mode, reranking)
+    that decide which chunks the answer was given from.
+    Questions are only compared within a scope.
+    """
+    key = json.dumps(
+        [model, embedding_model, sorted(set(checksums)), list(history), variant, retrieval or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Semantic cache of RAG chat answers backed by SQLite.
+
+    Entries are grouped by `answer_scope`; within a scope a question hits
+    when the cosine similarity of its embedding to a cached question's is at
+    least `similarity`. Each entry records the checksums it was answered
+    from, and `invalidate_checksums` drops every entry referencing a document
+    that is re-ingested or deleted. The database is shared by the API and
+    ingestion worker processes, so invalidation from a worker is seen by the
+    API immediately.
+    """
+
+    def __init__(
+        self,
+        path: str = ANSWER_CACHE_PATH,
+        similarity: float = ANSWER_CACHE_SIMILARITY,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        scan_limit: int = ANSWER_CACHE_SCAN_LIMIT,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ):
+        self.path = path
+        self.similarity = similarity
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.scan_limit = scan_limit
+        self.enabled = enabled
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, query TEXT NOT NULL,"
+                " vector BLOB NOT NULL, response TEXT NOT NULL,"
+                " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_scope ON answers (scope, last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answer_checksums ("
+                " answer_id INTEGER NOT NULL REFERENCES answers (id) ON DELETE CASCADE,"
+                " checksum TEXT NOT NULL, PRIMARY KEY (checksum, answer_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answer_checksums_answer ON answer_checksums (answer_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+
+    def get(self, scope: str, vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        Most similar cached answer in `scope`, if it clears the similarity threshold.
+
+        Returns:
+            Dict with the cached `response`, the cached `query` and its `similarity`, or None.
+        """
+        if not self.enabled:
+            return None
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, query, vector, response FROM answers WHERE scope = ? AND created_at >= ? ORDER BY last_used DESC LIMIT ?",
+            (scope, time.time() - self.ttl_seconds, self.scan_limit),
+        ).fetchall()
+        best = None
+        if rows:
+            query = self._unit(vector)
+            matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+            if matrix.shape[1] == query.shape[0]:
+                scores = matrix @ query
+                idx = int(np.argmax(scores))
+                if scores[idx] >= self.similarity:
+                    best = (rows[idx], float(scores[idx]))
+        with conn:
+            if best is None:
+                self._bump(conn, misses=1)
+                return None
+            (answer_id, cached_query, _, response), similarity = best
+            conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), answer_id))
+            self._bump(conn, hits=1)
+        return {"response": json.loads(response), "query": cached_query, "similarity": similarity}
+
+    def put(self, scope: str, query: str, vector: Sequence[float], checksums: Sequence[str], response: Any) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO answers (scope, query, vector, response, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, query, self._unit(vector).tobytes(), json.dumps(response, ensure_ascii=False, default=str), now, now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO answer_checksums (answer_id, checksum) VALUES (?, ?)",
+                [(cursor.lastrowid, checksum) for checksum in set(checksums)],
+            )
+            self._evict(conn)
+
+    def invalidate_checksums(self, checksums: Sequence[str]) -> int:
+        """
+        Drop every answer that was given from any of `checksums`.
+
+        Returns:
+            int: Number of answers removed.
+        """
+        if not self.enabled or not checksums:
+            return 0
+        conn = self._connect()
+        checksums = list(checksums)
+        removed = 0
+        with conn:
+            for i in range(0, len(checksums), 500):
+                part = checksums[i:i + 500]
+                removed += conn.execute(
+                    f"DELETE FROM answers WHERE id IN (SELECT answer_id FROM answer_checksums WHERE checksum IN ({','.join('?' * len(part))}))",
+                    part,
+                ).rowcount
+            self._bump(conn, invalidations=removed)
+        return removed
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._bump(conn, evictions=excess)
+
+    def _bump(self, conn: sqlite3.Connection, **deltas: int) -> None:
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, delta) for name, delta in deltas.items() if delta],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        conn = self._connect()
+        (entries,) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "enabled": True,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "similarity": self.similarity,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "invalidations": counters.get("invalidations", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+
+
+answer_cache = AnswerCache()
@@ -1,7 +1,9 @@
 import os
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader, UnstructuredWordDocumentLoader, UnstructuredPowerPointLoader
-from typing import List, Dict, Any, Tuple
+from langchain_core.documents import Document
+from pypdf import PdfReader
+from typing import List, Dict, Any, Iterator
 
 from const.variables import chunk_size, overlap
 
@@ -15,74 +17,99 @@ def chunk_file(abs_path: str, chunk_size: int = chunk_size, overlap: int = overl
     Returns:
         List of dictionaries containing 'text' and 'metadata' keys
     """
+    return list(iter_chunks(abs_path, chunk_size, overlap))
+
+def iter_chunks(abs_path: str, chunk_size: int = chunk_size, overlap: int = overlap) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily chunk a file, one page (or loader document) at a time.
+
+    Only the page currently being split is held in memory, so memory use
+    stays flat regardless of document size.
+
+    Yields:
+        Dictionaries containing 'text' and 'metadata' keys
+    """
     extension = os.path.splitext(abs_path)[1].lower()
     splitter = get_text_splitter(chunk_size, overlap)
     
     if extension == ".pdf":
         loader = PyPDFLoader(abs_path)
-        docs = loader.load()
-        parts = splitter.split_documents(docs)
-        chunks = []
-        for part in parts:
-            page_number = part.metadata.get('page', None)
-            if page_number is not None:
-                page_number = int(page_number) + 1 
-            else:
-                page_number = None
-                
-            chunks.append({
-                "text": part.page_content,
-                "metadata": {
-                    "page_number": page_number,
-                    "source_type": "pdf",
-                    "chunk_size": len(part.page_content)
-                }
-            })
-        return chunks
+        for doc in loader.lazy_load():
+            yield from _pdf_page_chunks(doc, splitter)
         
     elif extension in {".docx", ".doc"}:
-        try:
-            loader = UnstructuredWordDocumentLoader(abs_path)
-            docs = loader.load()
-            parts = splitter.split_documents(docs)
-            chunks = []
-            for part in parts:
-                chunks.append({
-                    "text": part.page_content,
-                    "metadata": {
-                        "page_number": None,
-                        "source_type": "word",
-                        "chunk_size": len(part.page_content)
-                    }
-                })
-            return chunks
-        except Exception:
-            return chunk_file_as_text(abs_path, splitter, "word")
+        yield from _iter_loader_chunks(
+            UnstructuredWordDocumentLoader, abs_path, splitter, "word",
+            page_number=lambda part: None,
+        )
             
     elif extension in {".pptx", ".ppt"}:
-        try:
-            loader = UnstructuredPowerPointLoader(abs_path)
-            docs = loader.load()
-            parts = splitter.split_documents(docs)
-            chunks = []
-            for part in parts:
-                slide_number = part.metadata.get('slide_number', None)
-                chunks.append({
+        yield from _iter_loader_chunks(
+            UnstructuredPowerPointLoader, abs_path, splitter, "powerpoint",
+            page_number=lambda part: part.metadata.get('slide_number', None),
+        )
+            
+    elif extension in {".txt", ".md", ".rtf", ".csv"}:
+        yield from chunk_file_as_text(abs_path, splitter, extension[1:])
+
+def _pdf_page_chunks(doc: Document, splitter: RecursiveCharacterTextSplitter) -> Iterator[Dict[str, Any]]:
+    for part in splitter.split_documents([doc]):
+        page_number = part.metadata.get('page', None)
+        if page_number is not None:
+            page_number = int(page_number) + 1 
+        else:
+            page_number = None
+            
+        yield {
+            "text": part.page_content,
+            "metadata": {
+                "page_number": page_number,
+                "source_type": "pdf",
+                "chunk_size": len(part.page_content)
+            }
+        }
+
+def pdf_page_count(abs_path: str) -> int:
+    return len(PdfReader(abs_path).pages)
+
+def chunk_pdf_pages(abs_path: str, first_page: int, last_page: int, chunk_size: int = chunk_size, overlap: int = overlap) -> List[Dict[str, Any]]:
+    """
+    Chunk pages [first_page, last_page) of a PDF (0-based), producing the same
+    chunks `iter_chunks` would for those pages.
+    """
+    splitter = get_text_splitter(chunk_size, overlap)
+    reader = PdfReader(abs_path)
+    chunks = []
+    for page in range(first_page, min(last_page, len(reader.pages))):
+        doc = Document(
+            page_content=reader.pages[page].extract_text(),
+            metadata={"source": abs_path, "page": page},
+        )
+        chunks.extend(_pdf_page_chunks(doc, splitter))
+    return chunks
+
+def _iter_loader_chunks(loader_cls, abs_path: str, splitter: RecursiveCharacterTextSplitter, source_type: str, page_number) -> Iterator[Dict[str, Any]]:
+    """
+    Stream chunks from an Unstructured loader, falling back to plain text
+    extraction if the loader fails before producing anything.
+    """
+    produced = False
+    try:
+        for doc in loader_cls(abs_path).lazy_load():
+            for part in splitter.split_documents([doc]):
+                produced = True
+                yield {
                     "text": part.page_content,
                     "metadata": {
-                        "page_number": slide_number,
-                        "source_type": "powerpoint",
+                        "page_number": page_number(part),
+                        "source_type": source_type,
                         "chunk_size": len(part.page_content)
                     }
-                })
-            return chunks
-        except Exception:
-            return chunk_file_as_text(abs_path, splitter, "powerpoint")
-            
-    elif extension in {".txt", ".md", ".rtf", ".csv"}:
-        return chunk_file_as_text(abs_path, splitter, extension[1:])
-    
-    return []
+                }
+    except Exception:
+        if produced:
+            raise
+        yield from chunk_file_as_text(abs_path, splitter, source_type)
 
 def chunk_file_as_text(abs_path: str, splitter: RecursiveCharacterTextSplitter, source_type: str) -> List[Dict[str, Any]]:
     """Fallback method for text-based files that don't have page information."""
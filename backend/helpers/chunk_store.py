@@ -0,0 +1,101 @@
+import os
+import json
+import zlib
+import sqlite3
+import threading
+from typing import Dict, Any, Sequence, Tuple
+
+from const.env_variables import CHUNK_STORE_PATH, CHUNK_STORE_COMPRESSION_LEVEL
+
+ChunkRecord = Tuple[str, str, str, str, Dict[str, Any]]
+
+
+class ChunkStore:
+    """
+    Chunk text and derived chunk metadata, keyed by Qdrant point id.
+
+    Qdrant only keeps the small payload fields used for filtering; the text
+    (zlib-compressed) and display-only metadata live here and are hydrated for
+    the top-k hits of a search. The database is shared by the API and the
+    ingestion worker processes.
+    """
+
+    def __init__(self, path: str = CHUNK_STORE_PATH, compression_level: int = CHUNK_STORE_COMPRESSION_LEVEL):
+        self.path = path
+        self.compression_level = compression_level
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " point_id TEXT PRIMARY KEY, checksum TEXT NOT NULL, filename TEXT NOT NULL,"
+                " text BLOB NOT NULL, metadata TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS chunks_file ON chunks (checksum, filename)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def put_many(self, records: Sequence[ChunkRecord]) -> None:
+        """Store (point_id, checksum, filename, text, metadata) records, replacing existing ones."""
+        if not records:
+            return
+        rows = [
+            (point_id, checksum, filename, zlib.compress(text.encode("utf-8"), self.compression_level), json.dumps(metadata, default=str))
+            for point_id, checksum, filename, text, metadata in records
+        ]
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)", rows)
+
+    def get_many(self, point_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up chunks by point id.
+
+        Returns:
+            Dict mapping point ids to their metadata plus `chunk_text`; unknown ids are absent.
+        """
+        ids = [str(point_id) for point_id in point_ids]
+        if not ids:
+            return {}
+        conn = self._connect()
+        found: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT point_id, text, metadata FROM chunks WHERE point_id IN ({','.join('?' * len(part))})",
+                part,
+            ).fetchall()
+            for point_id, blob, metadata in rows:
+                found[point_id] = {**json.loads(metadata), "chunk_text": zlib.decompress(blob).decode("utf-8")}
+        return found
+
+    def delete_file(self, checksum: str, filename: str) -> int:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM chunks WHERE checksum = ? AND filename = ?", (checksum, filename))
+        return cursor.rowcount
+
+    def delete_checksums(self, checksums: Sequence[str]) -> int:
+        conn = self._connect()
+        deleted = 0
+        with conn:
+            for i in range(0, len(checksums), 500):
+                part = list(checksums[i:i + 500])
+                cursor = conn.execute(f"DELETE FROM chunks WHERE checksum IN ({','.join('?' * len(part))})", part)
+                deleted += cursor.rowcount
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        count, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0) FROM chunks").fetchone()
+        return {"chunks": count, "compressed_bytes": stored}
+
+
+chunk_store = ChunkStore()
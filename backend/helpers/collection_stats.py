@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from const.env_variables import COLLECTION_STATS_PATH
+
+# (source_type, file_extension, page_number) of one chunk.
+ChunkKey = Tuple[str, str, Optional[int]]
+
+
+class CollectionStats:
+    """
+    Chunk counters per collection, file, source type, extension and page.
+
+    Ingestion adds a window's counts as it upserts it (the first window of a
+    file replaces whatever the file had before, so re-ingesting is
+    idempotent) and deleting a file drops its rows. Statistics are then
+    aggregated from a table whose size grows with files and pages, not with
+    points. Shared by the API and the ingestion worker processes.
+    """
+
+    def __init__(self, path: str = COLLECTION_STATS_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_counts ("
+                " collection TEXT NOT NULL, checksum TEXT NOT NULL, filename TEXT NOT NULL,"
+                " source_type TEXT NOT NULL, file_extension TEXT NOT NULL, page_number INTEGER NOT NULL,"
+                " chunks INTEGER NOT NULL,"
+                " PRIMARY KEY (collection, checksum, filename, source_type, file_extension, page_number))"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def add_chunks(self, collection: str, checksum: str, filename: str, chunks: Iterable[ChunkKey], replace: bool = False) -> None:
+        """Count chunks of a file; `replace` first drops the file's previous counts."""
+        # page_number is part of the primary key, so "no page" is stored as -1.
+        counts = Counter((source_type, file_extension, -1 if page is None else page) for source_type, file_extension, page in chunks)
+        conn = self._connect()
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM chunk_counts WHERE collection = ? AND checksum = ? AND filename = ?", (collection, checksum, filename))
+            conn.executemany(
+                "INSERT INTO chunk_counts VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(collection, checksum, filename, source_type, file_extension, page_number)"
+                " DO UPDATE SET chunks = chunks + excluded.chunks",
+                [(collection, checksum, filename, source_type, ext, page, n) for (source_type, ext, page), n in counts.items()],
+            )
+
+    def remove_file(self, collection: str, checksum: str, filename: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM chunk_counts WHERE collection = ? AND checksum = ? AND filename = ?", (collection, checksum, filename))
+
+    def remove_checksums(self, collection: str, checksums: List[str]) -> None:
+        conn = self._connect()
+        with conn:
+            for i in range(0, len(checksums), 500):
+                part = list(checksums[i:i + 500])
+                conn.execute(
+                    f"DELETE FROM chunk_counts WHERE collection = ? AND checksum IN ({','.join('?' * len(part))})",
+                    [collection, *part],
+                )
+
+    def replace_counts(self, collection: str, counts: Dict[Tuple[str, str, str, str, Optional[int]], int]) -> None:
+        """Replace all of a collection's counts with `counts`, keyed by (checksum, filename, source_type, file_extension, page_number)."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM chunk_counts WHERE collection = ?", (collection,))
+            conn.executemany(
+                "INSERT INTO chunk_counts VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(collection, checksum, filename, source_type, file_extension, page_number)"
+                " DO UPDATE SET chunks = chunks + excluded.chunks",
+                [
+                    (collection, checksum, filename, source_type, ext, -1 if page is None else page, n)
+                    for (checksum, filename, source_type, ext, page), n in counts.items()
+                ],
+            )
+
+    def clear(self, collection: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM chunk_counts WHERE collection = ?", (collection,))
+
+    def summary(self, collection: str) -> Dict[str, Any]:
+        conn = self._connect()
+        (total_chunks, total_files) = conn.execute(
+            "SELECT COALESCE(SUM(chunks), 0), COUNT(DISTINCT checksum || '/' || filename) FROM chunk_counts WHERE collection = ?",
+            (collection,),
+        ).fetchone()
+
+        def group(column: str, order: str) -> List[Tuple[Any, int]]:
+            return conn.execute(
+                f"SELECT {column}, SUM(chunks) FROM chunk_counts WHERE collection = ? GROUP BY {column} ORDER BY {order}",
+                (collection,),
+            ).fetchall()
+
+        return {
+            "total_points": total_chunks,
+            "total_files": total_files,
+            "source_types": dict(group("source_type", "2 DESC")),
+            "file_extensions": dict(group("file_extension", "2 DESC")),
+            "page_numbers": {str(page): n for page, n in group("page_number", "1") if page >= 0},
+        }
+
+
+collection_stats = CollectionStats()
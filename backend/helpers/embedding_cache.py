@@ -0,0 +1,159 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Sequence
+
+import numpy as np
+
+from const.env_variables import EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store backed by SQLite.
+
+    Entries are keyed by (sha256(text), model, dim), so identical chunks are
+    embedded once no matter which file, job or document version they came
+    from. The database is shared by the API and ingestion worker processes;
+    the least recently used entries are evicted once `max_entries` is
+    exceeded. Hit/miss counters are persisted alongside the entries.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, enabled: bool = EMBEDDING_CACHE_ENABLED):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " text_hash TEXT NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (text_hash, model, dim))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # The row count lives in `counters`, kept by triggers, so eviction
+            # does not scan the table on every write.
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS embeddings_inserted AFTER INSERT ON embeddings"
+                " BEGIN UPDATE counters SET value = value + 1 WHERE name = 'entries'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS embeddings_deleted AFTER DELETE ON embeddings"
+                " BEGIN UPDATE counters SET value = value - 1 WHERE name = 'entries'; END"
+            )
+            conn.commit()
+            if conn.execute("SELECT 1 FROM counters WHERE name = 'entries'").fetchone() is None:
+                # Caches created before the counter existed are counted once.
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("INSERT OR IGNORE INTO counters (name, value) SELECT 'entries', COUNT(*) FROM embeddings")
+                conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, texts: Sequence[str], model: str, dim: int) -> Dict[int, List[float]]:
+        """
+        Look up cached vectors for `texts`.
+
+        Returns:
+            Dict mapping positions in `texts` to their cached vectors; misses are absent.
+        """
+        if not self.enabled or not texts:
+            return {}
+        positions: Dict[str, List[int]] = {}
+        for idx, text in enumerate(texts):
+            positions.setdefault(text_hash(text), []).append(idx)
+
+        conn = self._connect()
+        found: Dict[int, List[float]] = {}
+        hashes = list(positions)
+        now = time.time()
+        with conn:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND dim = ? AND text_hash IN ({','.join('?' * len(part))})",
+                    [model, dim, *part],
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    for idx in positions[key]:
+                        found[idx] = vector
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE text_hash = ? AND model = ? AND dim = ?",
+                    [(now, key, model, dim) for key, _ in rows],
+                )
+            self._bump(conn, hits=len(found), misses=len(texts) - len(found))
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]], model: str, dim: int) -> None:
+        if not self.enabled or not texts:
+            return
+        now = time.time()
+        rows = [
+            (text_hash(text), model, dim, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        conn = self._connect()
+        with conn:
+            # An upsert rather than INSERT OR REPLACE, so a re-put is not counted as a new row.
+            conn.executemany(
+                "INSERT INTO embeddings VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(text_hash, model, dim) DO UPDATE SET vector = excluded.vector, last_used = excluded.last_used",
+                rows,
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        excess = self._entries(conn) - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._bump(conn, evictions=excess)
+
+    @staticmethod
+    def _entries(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM counters WHERE name = 'entries'").fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, conn: sqlite3.Connection, **deltas: int) -> None:
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, delta) for name, delta in deltas.items() if delta],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries = counters.get("entries", 0)
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "enabled": True,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+
+
+embedding_cache = EmbeddingCache()
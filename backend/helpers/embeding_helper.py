@@ -1,122 +1,210 @@
-from typing import List, Optional
+import os
+import re
+import asyncio
+import threading
+import torch
+from typing import List, Optional, Tuple, AsyncIterator, Dict
 from sentence_transformers import SentenceTransformer
-import httpx
+import tiktoken
 from fastapi import HTTPException
-from const.env_variables import OLLAMA_BASE_URL, MODEL_NAME_VAL, EMBEDDING_MODEL_NAME, OPENAI_API_KEY, OPENAI_EMBEDDING_MODEL
+from const.env_variables import (
+    EMBEDDING_MODEL_NAME,
+    OPENAI_API_KEY,
+    OPENAI_EMBEDDING_MODEL,
+    OPENAI_EMBEDDING_MAX_TOKENS_PER_BATCH,
+    OPENAI_EMBEDDING_MAX_IN_FLIGHT,
+    OPENAI_EMBEDDING_BATCH_RETRIES,
+    OLLAMA_EMBEDDING_MODEL,
+    OLLAMA_EMBED_BATCH_SIZE,
+    OLLAMA_EMBED_MAX_IN_FLIGHT,
+    OLLAMA_EMBED_BATCH_RETRIES,
+    EMBEDDING_MODEL_MMAP,
+    EMBEDDING_MODEL_MMAP_DIR,
+)
 from services.openAiService import open_ai_service
+from services.httpClients import ollama_client, ollama_sync_client
+from helpers.embedding_cache import embedding_cache
 
-_model: Optional[SentenceTransformer] = None
+_models: Dict[str, SentenceTransformer] = {}
+_models_lock = threading.Lock()
 
-def ensure_model_ready() -> SentenceTransformer:
-    global _model
-    if _model is None:
-        _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-    return _model
+def _shared_weights_path(model_name: str) -> str:
+    return os.path.join(EMBEDDING_MODEL_MMAP_DIR, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name) + ".pt")
 
-def embed_texts(texts: List[str], batch_size: int = 64) -> List[List[float]]:
+def _load_sentence_transformer(model_name: str) -> SentenceTransformer:
+    """
+    Load a SentenceTransformer whose CPU weights are memory-mapped from a file
+    shared by every process on the host.
+
+    The first process to load a model saves its state dict under
+    EMBEDDING_MODEL_MMAP_DIR; every process then swaps its parameters for
+    tensors mapped from that file, so uvicorn and ingestion workers share one
+    copy of the weights through the page cache instead of holding one each.
+    Delete the file to pick up new upstream weights.
+    """
+    model = SentenceTransformer(model_name)
+    if not EMBEDDING_MODEL_MMAP or model.device.type != "cpu":
+        return model
+    path = _shared_weights_path(model_name)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(EMBEDDING_MODEL_MMAP_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            torch.save(model.state_dict(), tmp)
+            os.replace(tmp, path)
+        state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        model.load_state_dict(state, assign=True)
+        model.eval()
+    except (TypeError, RuntimeError, OSError) as e:
+        # Older torch without mmap/assign, or a stale file: keep the privately loaded weights.
+        print(f"Shared weights unavailable for {model_name}, using a private copy: {str(e)}")
+    return model
+
+def ensure_model_ready(model_name: str = EMBEDDING_MODEL_NAME) -> SentenceTransformer:
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = _models[model_name] = _load_sentence_transformer(model_name)
+    return model
+
+def embed_texts(texts: List[str], batch_size: int = 64, model_name: str = EMBEDDING_MODEL_NAME) -> List[List[float]]:
     if not texts:
         return []
-    model = ensure_model_ready()
-    vectors = model.encode(
-        texts,
-        batch_size=batch_size,
-        show_progress_bar=False,
-        convert_to_numpy=True,
-        normalize_embeddings=True,
-    )
-    return [v.tolist() for v in vectors]
-
-
-def get_model_dim(use_openai: bool = False) -> int:
-    if use_openai:
-        return get_openai_model_dim()
-    else:
-        return ensure_model_ready().get_sentence_embedding_dimension()
-
-async def generate_embedding(text: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{OLLAMA_BASE_URL}/api/embeddings",
-            json={"model": MODEL_NAME_VAL, "prompt": text},
+    model = ensure_model_ready(model_name)
+    dim = model.get_sentence_embedding_dimension()
+    results = embedding_cache.get_many(texts, model_name, dim)
+    missing = [idx for idx in range(len(texts)) if idx not in results]
+    if missing:
+        missing_texts = [texts[idx] for idx in missing]
+        vectors = model.encode(
+            missing_texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
         )
-        if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code,
-                                detail=f"Failed to generate embedding: {response.text}")
-        return response.json()["embedding"]
+        vectors = [v.tolist() for v in vectors]
+        embedding_cache.put_many(missing_texts, vectors, model_name, dim)
+        results.update(zip(missing, vectors))
+    return [results[idx] for idx in range(len(texts))]
+
 
+def _token_counter(model: str):
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode_ordinary(text))
 
-async def generate_embedding_openai(text: str, model: str = OPENAI_EMBEDDING_MODEL):
+
+def plan_embedding_batches(
+    texts: List[str],
+    model: str = OPENAI_EMBEDDING_MODEL,
+    max_tokens: int = OPENAI_EMBEDDING_MAX_TOKENS_PER_BATCH,
+    max_items: int = 512,
+) -> List[Tuple[int, int]]:
     """
-    Generate embedding using OpenAI API.
-    
-    Args:
-        text: The text to embed
-        model: The OpenAI embedding model to use (default: text-embedding-3-small)
-    
-    Returns:
-        List[float]: The embedding vector
+    Split `texts` into contiguous (start, end) ranges bounded by token count.
+
+    A batch is closed when adding the next text would exceed `max_tokens` or
+    when it already holds `max_items` texts. A single oversized text still
+    gets its own batch.
     """
-    if not OPENAI_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI API key not configured"
-        )
-    
-    try:
-        response = await open_ai_service.create_embedding(
-            input_text=text,
-            model=model
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to generate OpenAI embedding: {str(e)}"
-        )
+    count_tokens = _token_counter(model)
+    batches: List[Tuple[int, int]] = []
+    start, tokens = 0, 0
+    for idx, text in enumerate(texts):
+        n = count_tokens(text)
+        if idx > start and (tokens + n > max_tokens or idx - start >= max_items):
+            batches.append((start, idx))
+            start, tokens = idx, 0
+        tokens += n
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
 
 
-async def embed_texts_openai(texts: List[str], model: str = OPENAI_EMBEDDING_MODEL, batch_size: int = 100) -> List[List[float]]:
+async def _embed_batch_openai(batch_texts: List[str], model: str, retries: int, dimensions: Optional[int] = None) -> List[List[float]]:
+    extra = {"dimensions": dimensions} if dimensions else {}
+    attempt = 0
+    while True:
+        try:
+            response = await open_ai_service.create_embedding(
+                input_text=batch_texts,
+                model=model,
+                **extra
+            )
+            return [data.embedding for data in response.data]
+        except Exception:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+async def iter_embedding_batches_openai(
+    texts: List[str],
+    model: str = OPENAI_EMBEDDING_MODEL,
+    batch_size: int = 512,
+    max_tokens: int = OPENAI_EMBEDDING_MAX_TOKENS_PER_BATCH,
+    max_in_flight: int = OPENAI_EMBEDDING_MAX_IN_FLIGHT,
+    dimensions: Optional[int] = None,
+) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
     """
-    Generate embeddings for multiple texts using OpenAI API with batching.
-    
-    Args:
-        texts: List of texts to embed
-        model: The OpenAI embedding model to use (default: text-embedding-3-small)
-        batch_size: Number of texts to process in each batch (OpenAI supports up to 2048 inputs per request)
-    
-    Returns:
-        List[List[float]]: List of embedding vectors
+    Embed `texts` with up to `max_in_flight` OpenAI requests at once.
+
+    Yields (indices, vectors) as soon as each batch is available, so callers
+    can start using early batches while later ones are still being embedded.
+    Vectors already in the embedding cache are yielded first; the remaining
+    batches may complete out of order, `indices` locates them in `texts`.
+    A failing batch is retried on its own before the whole call fails.
+    `dimensions` truncates v3 model vectors server-side (Matryoshka).
     """
     if not texts:
-        return []
-    
+        return
+
+    dim = dimensions or get_openai_model_dim(model)
+    cached = await asyncio.to_thread(embedding_cache.get_many, texts, model, dim)
+    if cached:
+        hit_indices = sorted(cached)
+        yield hit_indices, [cached[idx] for idx in hit_indices]
+
+    missing = [idx for idx in range(len(texts)) if idx not in cached]
+    if not missing:
+        return
+
     if not OPENAI_API_KEY:
         raise HTTPException(
             status_code=500,
             detail="OpenAI API key not configured"
         )
-    
-    all_embeddings = []
-    
-    for i in range(0, len(texts), batch_size):
-        batch_texts = texts[i:i + batch_size]
-        
-        try:
-            response = await open_ai_service.create_embedding(
-                input_text=batch_texts,
-                model=model
-            )
-            
-            batch_embeddings = [data.embedding for data in response.data]
-            all_embeddings.extend(batch_embeddings)
-            
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to generate OpenAI embeddings for batch {i//batch_size + 1}: {str(e)}"
-            )
-    
-    return all_embeddings
+
+    missing_texts = [texts[idx] for idx in missing]
+    batches = plan_embedding_batches(missing_texts, model=model, max_tokens=max_tokens, max_items=batch_size)
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def run(batch_no: int, start: int, end: int) -> Tuple[List[int], List[List[float]]]:
+        async with semaphore:
+            batch_texts = missing_texts[start:end]
+            try:
+                vectors = await _embed_batch_openai(batch_texts, model, OPENAI_EMBEDDING_BATCH_RETRIES, dimensions)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to generate OpenAI embeddings for batch {batch_no + 1}: {str(e)}"
+                )
+            await asyncio.to_thread(embedding_cache.put_many, batch_texts, vectors, model, dim)
+            return missing[start:end], vectors
+
+    tasks = [asyncio.create_task(run(n, start, end)) for n, (start, end) in enumerate(batches)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 def get_openai_model_dim(model: str = OPENAI_EMBEDDING_MODEL) -> int:
@@ -138,4 +226,102 @@ def get_openai_model_dim(model: str = OPENAI_EMBEDDING_MODEL) -> int:
     if model not in model_dimensions:
         raise ValueError(f"Unknown OpenAI embedding model: {model}")
     
-    return model_dimensions[model]
\ No newline at end of file
+    return model_dimensions[model]
+
+
+_ollama_dims: Dict[str, int] = {}
+
+
+async def _embed_batch_ollama(batch_texts: List[str], model: str, retries: int) -> List[List[float]]:
+    attempt = 0
+    while True:
+        try:
+            response = await ollama_client().post(
+                "/api/embed",
+                json={"model": model, "input": batch_texts, "truncate": True},
+            )
+            response.raise_for_status()
+            return response.json()["embeddings"]
+        except Exception:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+def get_ollama_model_dim(model: str = OLLAMA_EMBEDDING_MODEL) -> int:
+    """
+    Get the dimension of an Ollama embedding model.
+
+    Ollama does not report it in the model metadata, so a one-word probe is
+    embedded on first use and the result is remembered per model. Blocking
+    (it uses the pooled sync client); async code awaits `ollama_model_dim`.
+    """
+    if model not in _ollama_dims:
+        response = ollama_sync_client().post("/api/embed", json={"model": model, "input": ["dimension"]})
+        response.raise_for_status()
+        _ollama_dims[model] = len(response.json()["embeddings"][0])
+    return _ollama_dims[model]
+
+
+async def ollama_model_dim(model: str = OLLAMA_EMBEDDING_MODEL) -> int:
+    """`get_ollama_model_dim` probing through the pooled async `ollama_client()`."""
+    if model not in _ollama_dims:
+        _ollama_dims[model] = len((await _embed_batch_ollama(["dimension"], model, 0))[0])
+    return _ollama_dims[model]
+
+
+async def iter_embedding_batches_ollama(
+    texts: List[str],
+    model: str = OLLAMA_EMBEDDING_MODEL,
+    batch_size: int = OLLAMA_EMBED_BATCH_SIZE,
+    max_in_flight: int = OLLAMA_EMBED_MAX_IN_FLIGHT,
+) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+    """
+    Embed `texts` with the local Ollama server's batched `/api/embed` endpoint.
+
+    Same contract as `iter_embedding_batches_openai`: cache hits are yielded
+    first, then each batch of up to `batch_size` texts as it completes, with
+    at most `max_in_flight` requests outstanding.
+    """
+    if not texts:
+        return
+
+    dim = await ollama_model_dim(model)
+    cache_model = f"ollama/{model}"
+    cached = await asyncio.to_thread(embedding_cache.get_many, texts, cache_model, dim)
+    if cached:
+        hit_indices = sorted(cached)
+        yield hit_indices, [cached[idx] for idx in hit_indices]
+
+    missing = [idx for idx in range(len(texts)) if idx not in cached]
+    if not missing:
+        return
+
+    missing_texts = [texts[idx] for idx in missing]
+    step = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def run(batch_no: int, start: int, end: int) -> Tuple[List[int], List[List[float]]]:
+        async with semaphore:
+            batch_texts = missing_texts[start:end]
+            try:
+                vectors = await _embed_batch_ollama(batch_texts, model, OLLAMA_EMBED_BATCH_RETRIES)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to generate Ollama embeddings for batch {batch_no + 1}: {str(e)}"
+                )
+            await asyncio.to_thread(embedding_cache.put_many, batch_texts, vectors, cache_model, dim)
+            return missing[start:end], vectors
+
+    tasks = [
+        asyncio.create_task(run(n, start, min(start + step, len(missing_texts))))
+        for n, start in enumerate(range(0, len(missing_texts), step))
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,243 @@
+import os
+import json
+import sqlite3
+import mimetypes
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterator
+
+from const.env_variables import FILE_CATALOG_PATH, UPLOAD_DIR, JOBS_DIR
+
+SORTABLE_COLUMNS = ("created_at", "filename", "size_bytes", "job_status", "updated_at")
+
+
+def _download_url(checksum: str, filename: str) -> str:
+    return f"/files/{checksum}/{filename}/download"
+
+
+class FileCatalog:
+    """
+    SQLite index of stored files and the job that last ingested each one.
+
+    `upload` and `delete_file` keep the file records current and every job
+    status write updates the job link, so `/files` can filter, sort and page
+    without walking the upload tree or opening job files. A catalog that has
+    never been built is backfilled from disk on first use.
+    """
+
+    def __init__(self, path: str = FILE_CATALOG_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._built = False
+        self._build_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " storage_key TEXT PRIMARY KEY, checksum_sha256 TEXT NOT NULL, filename TEXT NOT NULL,"
+                " size_bytes INTEGER NOT NULL, content_type TEXT NOT NULL, created_at TEXT NOT NULL,"
+                " job_id TEXT, job_status TEXT, updated_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS files_created_at ON files (created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_filename ON files (filename)")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_checksum ON files (checksum_sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_job ON files (job_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            conn = self._connect()
+            if conn.execute("SELECT 1 FROM meta WHERE name = 'built_at'").fetchone() is None:
+                self.rebuild()
+            self._built = True
+
+    def add_file(self, storage_key: str, checksum: str, filename: str, size_bytes: int, content_type: Optional[str] = None, created_at: Optional[str] = None) -> None:
+        self._ensure_built()
+        now = datetime.utcnow().isoformat()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO files (storage_key, checksum_sha256, filename, size_bytes, content_type, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(storage_key) DO UPDATE SET size_bytes = excluded.size_bytes, updated_at = excluded.updated_at",
+                (storage_key, checksum, filename, size_bytes, content_type or "application/octet-stream", created_at or now, now),
+            )
+
+    def remove_file(self, checksum: str, filename: str) -> bool:
+        self._ensure_built()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM files WHERE checksum_sha256 = ? AND filename = ?", (checksum, filename))
+        return cursor.rowcount > 0
+
+    def link_job(self, job_id: str, storage_keys: Sequence[str], status: Optional[str]) -> None:
+        """
+        Record a job status for its files.
+
+        A queued job takes over its files; later status changes only touch
+        files still linked to that job, so an older job finishing late does
+        not hide a newer one.
+        """
+        if not storage_keys:
+            return
+        self._ensure_built()
+        now = datetime.utcnow().isoformat()
+        conn = self._connect()
+        with conn:
+            for i in range(0, len(storage_keys), 500):
+                part = list(storage_keys[i:i + 500])
+                conn.execute(
+                    f"UPDATE files SET job_id = ?, job_status = ?, updated_at = ?"
+                    f" WHERE storage_key IN ({','.join('?' * len(part))})"
+                    f" AND (job_id IS NULL OR job_id = ? OR ? = 'queued')",
+                    [job_id, status, now, *part, job_id, status],
+                )
+
+    def list_files(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        sort_by: str = "created_at",
+        descending: bool = True,
+        filename: Optional[str] = None,
+        checksum: Optional[str] = None,
+        content_type: Optional[str] = None,
+        job_status: Optional[str] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Page through stored files.
+
+        Returns:
+            Tuple of (number of matching files, requested page of file records).
+        """
+        if sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"sort_by must be one of: {', '.join(SORTABLE_COLUMNS)}")
+        self._ensure_built()
+        where, params = [], []
+        if filename:
+            where.append("filename LIKE ? ESCAPE '\\'")
+            params.append("%" + filename.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if checksum:
+            where.append("checksum_sha256 = ?")
+            params.append(checksum)
+        if content_type:
+            where.append("content_type = ?")
+            params.append(content_type)
+        if job_status:
+            where.append("job_status = ?")
+            params.append(job_status)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._connect()
+        (total,) = conn.execute(f"SELECT COUNT(*) FROM files{clause}", params).fetchone()
+        rows = conn.execute(
+            f"SELECT * FROM files{clause} ORDER BY {sort_by} {'DESC' if descending else 'ASC'}, storage_key"
+            f" LIMIT ? OFFSET ?",
+            [*params, -1 if limit is None else limit, offset],
+        ).fetchall()
+        items = []
+        for row in rows:
+            item = {
+                "filename": row["filename"],
+                "checksum_sha256": row["checksum_sha256"],
+                "size_bytes": row["size_bytes"],
+                "storage_key": row["storage_key"],
+                "content_type": row["content_type"],
+                "created_at": row["created_at"],
+                "download_url": _download_url(row["checksum_sha256"], row["filename"]),
+            }
+            if row["job_id"]:
+                item["job_id"] = row["job_id"]
+                item["job_status"] = row["job_status"]
+            items.append(item)
+        return total, items
+
+    def rebuild(self) -> int:
+        """
+        Re-create the catalog from the upload tree and the job files.
+
+        Returns:
+            int: Number of files catalogued.
+        """
+        jobs: Dict[str, Tuple[str, str, str]] = {}
+        for payload in _iter_job_files():
+            for key in payload.get("items", []) or []:
+                stamp = payload.get("updated_at") or ""
+                if key not in jobs or stamp > jobs[key][2]:
+                    jobs[key] = (payload.get("job_id"), payload.get("status"), stamp)
+
+        now = datetime.utcnow().isoformat()
+        rows = []
+        for item in _scan_upload_dir():
+            job_id, status, _ = jobs.get(item["storage_key"], (None, None, None))
+            rows.append((
+                item["storage_key"], item["checksum_sha256"], item["filename"], item["size_bytes"],
+                item["content_type"], item["created_at"], job_id, status, now,
+            ))
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM files")
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('built_at', ?)", (now,))
+        return len(rows)
+
+
+def _iter_job_files() -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(JOBS_DIR):
+        return
+    for fname in os.listdir(JOBS_DIR):
+        if not fname.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(JOBS_DIR, fname), "r", encoding="utf-8") as f:
+                yield json.load(f)
+        except Exception:
+            continue
+
+
+def _scan_upload_dir() -> Iterator[Dict[str, Any]]:
+    for root, dirs, files in os.walk(UPLOAD_DIR):
+        rel_root = os.path.relpath(root, UPLOAD_DIR)
+        parts = rel_root.split(os.sep)
+        if parts[0] in {".", "tmp", ".jobs", ".cache", ".store"}:
+            continue
+        for fname in files:
+            rel_path = os.path.join(rel_root, fname)
+            path_parts = rel_path.split(os.sep)
+            if len(path_parts) < 4:
+                continue
+            a, b, checksum, filename = path_parts[-4:]
+            if a != checksum[:2] or b != checksum[2:4] or filename != fname:
+                continue
+            abs_path = os.path.join(UPLOAD_DIR, rel_path)
+            try:
+                size = os.path.getsize(abs_path)
+                mtime = os.path.getmtime(abs_path)
+            except FileNotFoundError:
+                continue
+            ctype, _ = mimetypes.guess_type(filename)
+            yield {
+                "filename": filename,
+                "checksum_sha256": checksum,
+                "size_bytes": size,
+                "storage_key": os.path.join(a, b, checksum, filename),
+                "content_type": ctype or "application/octet-stream",
+                "created_at": datetime.utcfromtimestamp(mtime).isoformat(),
+            }
+
+
+file_catalog = FileCatalog()
@@ -1,74 +1,22 @@
 import os
-import mimetypes
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Tuple
 import uuid
 import hashlib
-from const.env_variables import UPLOAD_DIR, JOBS_DIR, TMP_DIR
+from const.env_variables import UPLOAD_DIR, TMP_DIR
+from helpers.file_catalog import file_catalog
 
 os.makedirs(TMP_DIR, exist_ok=True)
 
-def _find_job_for_storage_key(storage_key: str) -> Optional[Dict[str, str]]:
-    """Find job metadata for a given storage_key by scanning job files."""
-    try:
-        if not os.path.exists(JOBS_DIR):
-            return None
-        for fname in os.listdir(JOBS_DIR):
-            if not fname.endswith(".json"):
-                continue
-            job_path = os.path.join(JOBS_DIR, fname)
-            try:
-                with open(job_path, "r", encoding="utf-8") as jf:
-                    data = jf.read()
-                import json as _json
-                payload = _json.loads(data)
-            except Exception:
-                continue
-            items = payload.get("items", []) or []
-            if storage_key in items:
-                return {"job_id": payload.get("job_id"), "job_status": payload.get("status")}
-        return None
-    except Exception:
-        return None
-
-
-def list_saved_files() -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    for root, dirs, files in os.walk(UPLOAD_DIR):
-        rel_root = os.path.relpath(root, UPLOAD_DIR)
-        parts = rel_root.split(os.sep)
-        if parts[0] in {".", "tmp", ".jobs"}:
-            continue
-        for fname in files:
-            rel_path = os.path.join(rel_root, fname) if rel_root != "." else fname
-            path_parts = rel_path.split(os.sep)
-            if len(path_parts) < 4:
-                continue
-            a, b, checksum, filename = path_parts[-4:]
-            if a != checksum[:2] or b != checksum[2:4] or filename != fname:
-                continue
-            abs_path = os.path.join(UPLOAD_DIR, rel_path)
-            try:
-                size = os.path.getsize(abs_path)
-                mtime = os.path.getmtime(abs_path)
-            except FileNotFoundError:
-                continue
-            ctype, _ = mimetypes.guess_type(filename)
-            item: Dict[str, Any] = {
-                "filename": filename,
-                "checksum_sha256": checksum,
-                "size_bytes": size,
-                "storage_key": os.path.join(a, b, checksum, filename),
-                "content_type": ctype or "application/octet-stream",
-                "created_at": datetime.utcfromtimestamp(mtime).isoformat(),
-                "download_url": f"/files/{checksum}/{filename}/download",
-            }
-            job_info = _find_job_for_storage_key(item["storage_key"])
-            if job_info:
-                item.update(job_info)
-            items.append(item)
-    items.sort(key=lambda x: x["created_at"], reverse=True)
-    return items
+def list_saved_files(**query) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Page through stored files from the file catalog.
+
+    Accepts the filters, sorting and paging arguments of `FileCatalog.list_files`.
+
+    Returns:
+        Tuple of (number of matching files, requested page of file records).
+    """
+    return file_catalog.list_files(**query)
 
 def sha256_stream_to_tmp(src_fobj) -> tuple[str, str, int]:
     """Zapisuje stream do pliku tymczasowego, licząc SHA-256 i rozmiar."""
@@ -103,6 +51,7 @@ def remove_file_by_checksum_and_filename(checksum: str, filename: str) -> bool:
     """
     rel_path = storage_path_for_checksum(checksum, filename)
     abs_path = os.path.join(UPLOAD_DIR, rel_path)
+    file_catalog.remove_file(checksum, filename)
     try:
         os.remove(abs_path)
         return True
@@ -111,6 +60,25 @@ def remove_file_by_checksum_and_filename(checksum: str, filename: str) -> bool:
     except Exception as e:
         return False
 
+def remove_files_by_checksum(checksum: str) -> List[str]:
+    """
+    Removes every stored file with the given checksum.
+
+    Returns:
+        List[str]: Names of the removed files.
+    """
+    checksum_dir = os.path.join(UPLOAD_DIR, checksum[:2], checksum[2:4], checksum)
+    try:
+        filenames = os.listdir(checksum_dir)
+    except FileNotFoundError:
+        return []
+    removed = [filename for filename in filenames if remove_file_by_checksum_and_filename(checksum, filename)]
+    try:
+        os.rmdir(checksum_dir)
+    except OSError:
+        pass
+    return removed
+
 def load_prompt(prompt_filename: str) -> str:
     """
     Loads a prompt file from the prompts directory.
@@ -1,13 +1,19 @@
 import os
 import json
+import time
 from datetime import datetime
+import asyncio
+from collections import Counter
 
-from typing import List, Dict, Any
-from helpers.chunk_helper import chunk_file
-from services.qdrantService import qdrant_service
+from typing import List, Dict, Any, Iterable, Optional
+from helpers.parse_helper import iter_chunks_parallel
+from services.qdrantService import QdrantService, qdrant_service, parse_storage_key
+from services.qdrantUpsertEngine import QdrantUpsertEngine
+from helpers.file_catalog import file_catalog
 from fastapi import HTTPException
 
-from const.env_variables import UPLOAD_DIR, JOBS_DIR
+from const.env_variables import UPLOAD_DIR, JOBS_DIR, INGESTION_CHUNK_WINDOW
+from const.variables import chunk_size, overlap
 
 
 def job_file(job_id: str) -> str:
@@ -22,6 +28,68 @@ def write_job(job_id: str, payload: Dict[str, Any]) -> None:
     with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(payload, f, ensure_ascii=False, indent=2)
     os.replace(tmp_path, jf)
+    file_catalog.link_job(job_id, payload.get("items") or [], payload.get("status"))
+
+
+def job_lock_file(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.lock")
+
+
+def _lock_is_stale(path: str) -> bool:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            pid = int(f.read().strip())
+    except FileNotFoundError:
+        return True
+    except (OSError, ValueError):
+        # Being written by the process that just created it, unless that process died doing so.
+        return time.time() - os.path.getmtime(path) > 30
+    if pid == os.getpid():
+        # Jobs are deduplicated within a process before they are claimed.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def claim_job(job_id: str) -> bool:
+    """
+    Take a job's lock file, so that only one process runs the job.
+
+    The lock is created with O_EXCL and records the owner's pid; a lock left
+    behind by a process that no longer exists is taken over.
+
+    Returns:
+        bool: False if another live process holds the job.
+    """
+    path = job_lock_file(job_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not _lock_is_stale(path):
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def release_job(job_id: str) -> None:
+    try:
+        os.remove(job_lock_file(job_id))
+    except FileNotFoundError:
+        pass
 
 
 def read_job(job_id: str) -> Dict[str, Any]:
@@ -32,29 +100,129 @@ def read_job(job_id: str) -> Dict[str, Any]:
         return json.load(f)
 
 
-def process_job(job_id: str, storage_keys: List[str]) -> None:
-    write_job(job_id, {"job_id": job_id, "status": "processing", "items": storage_keys})
-    try:
-        total_chunks = 0
-        total_upserted = 0
-        per_file = []
-
-        for key in storage_keys:
-            abs_path = os.path.join(UPLOAD_DIR, key)
-            chunks_with_metadata = chunk_file(abs_path)
-            chunks = [chunk["text"] for chunk in chunks_with_metadata]
-            metadata_list = [chunk["metadata"] for chunk in chunks_with_metadata]
-            
-            upserted = qdrant_service.upsert_chunks_to_qdrant(key, chunks, metadata_list, job_id=job_id, use_openai=True)
-            total_chunks += len(chunks)
-            total_upserted += upserted
-            per_file.append({"storage_key": key, "chunks": len(chunks), "upserted": upserted})
-
-        write_job(job_id, {
-            "job_id": job_id,
-            "status": "completed",
-            "items": storage_keys,
-            "summary": {"total_chunks": total_chunks, "total_upserted": total_upserted, "per_file": per_file},
-        })
-    except Exception as e:
-        write_job(job_id, {"job_id": job_id, "status": "failed", "error": str(e), "items": storage_keys})
\ No newline at end of file
+def list_jobs(statuses: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Return all persisted jobs whose status is one of `statuses`, oldest first.
+
+    Unreadable or partially written job files are skipped.
+    """
+    wanted = set(statuses)
+    jobs = []
+    if not os.path.exists(JOBS_DIR):
+        return jobs
+    for fname in os.listdir(JOBS_DIR):
+        if not fname.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(JOBS_DIR, fname), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception:
+            continue
+        if payload.get("status") in wanted:
+            jobs.append(payload)
+    jobs.sort(key=lambda j: j.get("updated_at") or "")
+    return jobs
+
+
+async def process_file_async(job_id: str, storage_key: str, force_reindex: bool = False) -> Dict[str, Any]:
+    """
+    Chunk, embed and upsert a single stored file.
+
+    Files already fully indexed with the current chunking parameters are
+    skipped unless `force_reindex` is set, in which case their existing
+    points are removed first. Parsing, embedding and upserting overlap: the
+    parse pool keeps working on later pages while a window is embedded.
+
+    Returns:
+        Dict with 'storage_key', 'chunks', 'upserted' counts and 'skipped' flag.
+    """
+    if force_reindex:
+        info = parse_storage_key(storage_key)
+        await asyncio.to_thread(qdrant_service.delete_points_by_checksum_and_filename, info["checksum"], info["filename"])
+    elif await asyncio.to_thread(qdrant_service.is_file_indexed, storage_key, chunk_size, overlap):
+        return {"storage_key": storage_key, "chunks": 0, "upserted": 0, "skipped": True}
+
+    abs_path = os.path.join(UPLOAD_DIR, storage_key)
+    total_chunks = 0
+    upserted = 0
+    upserter = QdrantUpsertEngine(await QdrantService.ensure_async_qdrant_ready())
+    chunk_counts: Counter = Counter()
+
+    async def flush(window: List[Dict[str, Any]]) -> int:
+        return await qdrant_service.upsert_chunks_to_qdrant(
+            storage_key,
+            [chunk["text"] for chunk in window],
+            [chunk["metadata"] for chunk in window],
+            job_id=job_id,
+            chunk_size=chunk_size, overlap=overlap, start_index=total_chunks, mark_complete=False,
+            upserter=upserter, chunk_counts=chunk_counts,
+        )
+
+    # Parse, embed and upsert in bounded windows so memory does not grow with the document.
+    window: List[Dict[str, Any]] = []
+    async for chunk in iter_chunks_parallel(abs_path, chunk_size, overlap):
+        window.append(chunk)
+        if len(window) >= INGESTION_CHUNK_WINDOW:
+            upserted += await flush(window)
+            total_chunks += len(window)
+            window = []
+    if window:
+        upserted += await flush(window)
+        total_chunks += len(window)
+
+    await upserter.flush()
+    # Statistics follow the points only once Qdrant has acknowledged them.
+    await qdrant_service.record_chunk_counts(storage_key, chunk_counts)
+    if total_chunks:
+        await qdrant_service.mark_file_indexed(storage_key, chunk_size, overlap)
+    return {"storage_key": storage_key, "chunks": total_chunks, "upserted": upserted, "skipped": False}
+
+
+async def process_files_async(job_id: str, storage_keys: List[str], force_reindex: bool = False) -> List[Dict[str, Any]]:
+    """
+    Ingest several files concurrently on one event loop.
+
+    A failing file does not abort the others; its result carries an 'error'
+    message instead of counts.
+    """
+    results = await asyncio.gather(
+        *(process_file_async(job_id, key, force_reindex) for key in storage_keys),
+        return_exceptions=True,
+    )
+    return [
+        {"storage_key": key, "error": str(result) or type(result).__name__} if isinstance(result, BaseException) else result
+        for key, result in zip(storage_keys, results)
+    ]
+
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_worker_loop() -> asyncio.AbstractEventLoop:
+    # One long-lived loop per worker process, so pooled OpenAI/Qdrant
+    # connections survive across files instead of being rebuilt per call.
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def process_files(job_id: str, storage_keys: List[str], force_reindex: bool = False) -> List[Dict[str, Any]]:
+    """
+    Worker-process entry point for a batch of files of one job.
+
+    Runs inside ingestion worker processes, so it must stay a module-level
+    function with picklable arguments and return value.
+    """
+    return _get_worker_loop().run_until_complete(process_files_async(job_id, storage_keys, force_reindex))
+
+
+def summarize(per_file: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "total_chunks": sum(item["chunks"] for item in per_file),
+        "total_upserted": sum(item["upserted"] for item in per_file),
+        "total_skipped": sum(1 for item in per_file if item.get("skipped")),
+        "per_file": per_file,
+    }
+
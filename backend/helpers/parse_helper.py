@@ -0,0 +1,133 @@
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, AsyncIterator, Iterator, List, Deque
+
+from helpers.chunk_helper import chunk_file, chunk_pdf_pages, pdf_page_count, iter_chunks
+from const.env_variables import PARSE_WORKERS, PARSE_PAGES_PER_TASK, PARSE_FILE_TIMEOUT
+from const.variables import chunk_size, overlap
+
+# Parse pools not currently leased by a file. Each file parses in a pool of
+# its own, so killing the pool of a hung or crashed document cannot fail the
+# other files a worker is ingesting concurrently.
+_idle_pools: List[ProcessPoolExecutor] = []
+_pools_lock = threading.Lock()
+
+
+class ParseError(Exception):
+    """Raised when a document cannot be parsed in time or crashes its parser."""
+
+
+def _acquire_pool() -> ProcessPoolExecutor:
+    """Lease a parse pool for one file, reusing an idle one so workers are not respawned per file."""
+    with _pools_lock:
+        if _idle_pools:
+            return _idle_pools.pop()
+    return ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _release_pool(pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        _idle_pools.append(pool)
+
+
+def _kill_pool(pool: ProcessPoolExecutor) -> None:
+    """Tear down a leased parse pool, killing workers stuck on a hung or crashed document."""
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ParseBudget:
+    """Tracks how long a file has spent blocked on parsing, excluding time the consumer holds the generator."""
+
+    def __init__(self, abs_path: str, timeout: float):
+        self.abs_path = abs_path
+        self.timeout = timeout
+        self.remaining = timeout
+
+    async def wait(self, future: Future) -> Any:
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(0.0, self.remaining))
+        except (asyncio.TimeoutError, FutureTimeoutError):
+            raise ParseError(f"Parsing '{os.path.basename(self.abs_path)}' timed out after {self.timeout:.0f}s")
+        except BrokenProcessPool:
+            raise ParseError(f"Parser crashed on '{os.path.basename(self.abs_path)}' (malformed document?)")
+        finally:
+            self.remaining -= time.monotonic() - started
+
+
+async def _iter_in_thread(chunks: Iterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+async def iter_chunks_parallel(abs_path: str, chunk_size: int = chunk_size, overlap: int = overlap, timeout: float = PARSE_FILE_TIMEOUT) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Asynchronously chunk a file in the parse process pool.
+
+    PDFs are split into ranges of PARSE_PAGES_PER_TASK pages that are parsed
+    in parallel; at most PARSE_WORKERS ranges are in flight ahead of the
+    consumer, and chunks are yielded in document order. Other formats are
+    parsed as a single task. Parsing runs in separate processes leased to
+    this file alone, so a malformed document that hangs or crashes its parser
+    only fails this file.
+
+    Raises:
+        ParseError: If the file spends more than `timeout` seconds blocked on
+            parsing, or the parser crashes.
+    """
+    if PARSE_WORKERS <= 0:
+        async for chunk in _iter_in_thread(iter_chunks(abs_path, chunk_size, overlap)):
+            yield chunk
+        return
+
+    budget = _ParseBudget(abs_path, timeout)
+    pool = _acquire_pool()
+    submitted: List[Future] = []
+    failed = False
+
+    def submit(fn, *args) -> Future:
+        future = pool.submit(fn, *args)
+        submitted.append(future)
+        return future
+
+    try:
+        if os.path.splitext(abs_path)[1].lower() != ".pdf":
+            for chunk in await budget.wait(submit(chunk_file, abs_path, chunk_size, overlap)):
+                yield chunk
+            return
+
+        pages = await budget.wait(submit(pdf_page_count, abs_path))
+        ranges = deque((start, min(start + PARSE_PAGES_PER_TASK, pages)) for start in range(0, pages, PARSE_PAGES_PER_TASK))
+        in_flight: Deque[Future] = deque()
+        while ranges or in_flight:
+            while ranges and len(in_flight) < PARSE_WORKERS:
+                first, last = ranges.popleft()
+                in_flight.append(submit(chunk_pdf_pages, abs_path, first, last, chunk_size, overlap))
+            for chunk in await budget.wait(in_flight.popleft()):
+                yield chunk
+    except ParseError:
+        failed = True
+        raise
+    finally:
+        for future in submitted:
+            future.cancel()
+        # Reuse the pool only if none of its workers can still be busy with
+        # this file (a hung task, or ranges left running when the consumer stopped early).
+        if failed or not all(future.done() for future in submitted):
+            _kill_pool(pool)
+        else:
+            _release_pool(pool)
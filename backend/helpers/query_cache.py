@@ -0,0 +1,140 @@
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from const.env_variables import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL_SECONDS, RERANK_CACHE_MAX_ENTRIES, RERANK_CACHE_TTL_SECONDS
+
+
+def normalize_query(query: str) -> str:
+    """Collapse unicode forms, whitespace and case so trivially different queries share a key."""
+    return " ".join(unicodedata.normalize("NFKC", query).split()).casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU cache of query embeddings with a time-to-live.
+
+    Keyed by (provider model, normalized query). Sits in front of the shared
+    SQLite embedding cache: a miss in `embed_query` goes to the
+    collection's `EmbeddingProvider`, which consults the shared store before
+    calling the model.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl_seconds: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, query: str, model: str) -> Optional[List[float]]:
+        key = (model, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, vector = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, model: str, vector: List[float]) -> None:
+        key = (model, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / total if total else None,
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+class RerankScoreCache:
+    """
+    In-process LRU cache of cross-encoder scores keyed by (model, query, point id).
+
+    The query is used verbatim, since that is the text the cross-encoder
+    scores. Point ids are derived from the file checksum and chunk position, so a
+    cached score stays valid for as long as the point exists.
+    """
+
+    def __init__(self, max_entries: int = RERANK_CACHE_MAX_ENTRIES, ttl_seconds: float = RERANK_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, query: str, model: str, point_ids: List[str]) -> Dict[str, float]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for point_id in point_ids:
+                key = (model, query, point_id)
+                entry = self._entries.get(key)
+                if entry is None or now - entry[0] > self.ttl_seconds:
+                    self._entries.pop(key, None)
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[point_id] = entry[1]
+                self.hits += 1
+        return found
+
+    def put_many(self, query: str, model: str, scores: Dict[str, float]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for point_id, score in scores.items():
+                key = (model, query, point_id)
+                self._entries[key] = (now, score)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else None,
+            }
+
+
+rerank_score_cache = RerankScoreCache()
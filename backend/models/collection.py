@@ -1,6 +1,22 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class Collection(BaseModel):
     name: str
-    vector_size: int = 1024
+    vector_size: Optional[int] = None
     distance: str = "Cosine"
+    embedding_provider: Optional[str] = None
+    embedding_model: Optional[str] = None
+    dimensions: Optional[int] = None
+    profile: Optional[str] = None
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    on_disk: Optional[bool] = None
+    hybrid: bool = False
+    sparse_model: Optional[str] = None
+
+class CollectionProfile(BaseModel):
+    profile: str
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    on_disk: Optional[bool] = None
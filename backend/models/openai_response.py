@@ -19,6 +19,10 @@ class OpenAIChatRequest(BaseModel):
     messages: List[OpenAIMessage]
     documents: Optional[List[Document]] = Field(default_factory=list, description="List of documents to search in Qdrant")
     max_results: Optional[int] = Field(default=5, ge=1, le=20, description="Maximum number of results to return from Qdrant search")
+    fast_path: Optional[bool] = Field(default=None, description="Skip the no-context baseline and the judge. When unset, off unless CHAT_FAST_PATH_AUTO enables it under load")
+    search_mode: Optional[str] = Field(default=None, description="Retrieval mode: auto (hybrid when the collection has sparse vectors), dense or hybrid")
+    rerank: Optional[bool] = Field(default=None, description="Rerank over-fetched chunks with the cross-encoder. When unset, RERANK_ENABLED decides")
+    rerank_budget_ms: Optional[float] = Field(default=None, ge=0, description="Latency budget for reranking; the retrieval order is kept when it would be exceeded")
 
 class OpenAIContentItem(BaseModel):
     type: str
@@ -0,0 +1,12 @@
+from services.qdrantService import QdrantService
+
+
+def main() -> None:
+    client = QdrantService.ensure_qdrant_ready()
+    for collection in client.get_collections().collections:
+        created = QdrantService.ensure_payload_indexes(client, collection.name)
+        print(f"{collection.name}: {', '.join(created) if created else 'up to date'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+from typing import Dict, Any, Optional
+
+from qdrant_client import models as qmodels
+
+from services.collectionSettings import collection_settings
+from const.env_variables import QDRANT_COLLECTION, QDRANT_COLLECTION_PROFILE
+
+# Storage/index presets for a collection. Quantized profiles keep the compact
+# vectors in RAM for the HNSW walk and the full vectors on disk for rescoring
+# the oversampled candidates, which is where most of the RAM saving comes from.
+COLLECTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "on_disk": False,
+        "hnsw": {"m": 16, "ef_construct": 100},
+        "quantization": None,
+        "search": {},
+    },
+    "scalar": {
+        "on_disk": True,
+        "hnsw": {"m": 16, "ef_construct": 128},
+        "quantization": "scalar",
+        "search": {"rescore": True, "oversampling": 2.0},
+    },
+    "binary": {
+        "on_disk": True,
+        "hnsw": {"m": 16, "ef_construct": 128},
+        "quantization": "binary",
+        "search": {"rescore": True, "oversampling": 3.0},
+    },
+    "product": {
+        "on_disk": True,
+        "hnsw": {"m": 32, "ef_construct": 200},
+        "quantization": "product",
+        "search": {"rescore": True, "oversampling": 4.0},
+    },
+}
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}'. Available: {', '.join(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[name]
+
+
+def make_profile(name: str, hnsw_m: Optional[int] = None, hnsw_ef_construct: Optional[int] = None, on_disk: Optional[bool] = None) -> Dict[str, Any]:
+    """The named preset with optional HNSW and on-disk overrides applied."""
+    preset = get_profile(name)
+    hnsw = dict(preset["hnsw"])
+    if hnsw_m is not None:
+        hnsw["m"] = hnsw_m
+    if hnsw_ef_construct is not None:
+        hnsw["ef_construct"] = hnsw_ef_construct
+    return {
+        "name": name,
+        "on_disk": preset["on_disk"] if on_disk is None else on_disk,
+        "hnsw": hnsw,
+        "quantization": preset["quantization"],
+        "search": dict(preset["search"]),
+    }
+
+
+def collection_profile(collection_name: Optional[str] = None) -> Dict[str, Any]:
+    """Storage profile of a collection, falling back to QDRANT_COLLECTION_PROFILE."""
+    entry = collection_settings.get(collection_name or QDRANT_COLLECTION, "profile")
+    hnsw = entry.get("hnsw") or {}
+    return make_profile(
+        entry.get("name") or QDRANT_COLLECTION_PROFILE,
+        hnsw_m=hnsw.get("m"),
+        hnsw_ef_construct=hnsw.get("ef_construct"),
+        on_disk=entry.get("on_disk"),
+    )
+
+
+def assign_profile(collection_name: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    collection_settings.set(collection_name, "profile", {
+        "name": profile["name"],
+        "on_disk": profile["on_disk"],
+        "hnsw": profile["hnsw"],
+    })
+    return profile
+
+
+def vectors_config(profile: Dict[str, Any], size: int, distance: qmodels.Distance = qmodels.Distance.COSINE) -> qmodels.VectorParams:
+    return qmodels.VectorParams(size=size, distance=distance, on_disk=profile["on_disk"])
+
+
+def hnsw_config(profile: Dict[str, Any]) -> qmodels.HnswConfigDiff:
+    return qmodels.HnswConfigDiff(**profile["hnsw"])
+
+
+def quantization_config(profile: Dict[str, Any]) -> Optional[qmodels.QuantizationConfig]:
+    kind = profile["quantization"]
+    if kind == "scalar":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(type=qmodels.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if kind == "binary":
+        return qmodels.BinaryQuantization(binary=qmodels.BinaryQuantizationConfig(always_ram=True))
+    if kind == "product":
+        return qmodels.ProductQuantization(
+            product=qmodels.ProductQuantizationConfig(compression=qmodels.CompressionRatio.X16, always_ram=True)
+        )
+    return None
+
+
+def search_params(profile: Dict[str, Any], ef: Optional[int] = None, exact: Optional[bool] = None, oversampling: Optional[float] = None) -> Optional[qmodels.SearchParams]:
+    """
+    Build search parameters for a collection: request overrides win over the
+    profile's defaults. Quantized collections rescore oversampled candidates
+    with the original vectors.
+    """
+    quantization = None
+    if profile["quantization"]:
+        quantization = qmodels.QuantizationSearchParams(
+            ignore=False,
+            rescore=profile["search"].get("rescore", True),
+            oversampling=oversampling or profile["search"].get("oversampling"),
+        )
+    if ef is None and exact is None and quantization is None:
+        return None
+    return qmodels.SearchParams(hnsw_ef=ef, exact=bool(exact), quantization=quantization)
@@ -0,0 +1,61 @@
+import os
+import json
+import threading
+from typing import Dict, Optional, Any
+
+from const.env_variables import COLLECTION_SETTINGS_PATH
+
+
+class CollectionSettingsStore:
+    """
+    Per-collection settings (embedding provider, storage profile, ...) kept in
+    a small JSON file next to the uploads.
+
+    The API process and the ingestion workers read the same file, so every
+    process agrees on how a collection is embedded and stored; it is re-read
+    whenever its mtime changes.
+    """
+
+    def __init__(self, path: str = COLLECTION_SETTINGS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            self._settings, self._mtime = {}, None
+            return self._settings
+        if mtime != self._mtime:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._settings = json.load(f)
+            self._mtime = mtime
+        return self._settings
+
+    def _save(self, settings: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._settings, self._mtime = settings, os.path.getmtime(self.path)
+
+    def collections(self) -> list:
+        with self._lock:
+            return list(self._load())
+
+    def get(self, collection_name: str, section: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._load().get(collection_name, {}).get(section) or {})
+
+    def set(self, collection_name: str, section: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            settings = dict(self._load())
+            settings[collection_name] = {**settings.get(collection_name, {}), section: value}
+            self._save(settings)
+        return value
+
+
+collection_settings = CollectionSettingsStore()
@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
+
+from helpers.job_helper import write_job, read_job, list_jobs, claim_job, release_job
+from helpers.files_helper import remove_files_by_checksum
+from services.qdrantService import qdrant_service
+from const.env_variables import DELETE_BATCH_SIZE, INGESTION_RESUME_ON_STARTUP
+
+
+class DeletionService:
+    """
+    Runs bulk document deletions as background jobs.
+
+    Jobs are persisted in `.jobs` next to ingestion jobs (with
+    `type: "delete"`), so progress is visible through `/jobs/{job_id}` and an
+    interrupted deletion is resumed on startup. Documents are deleted in
+    batches of `batch_size` checksums: one server-side filter delete removes
+    the batch's points, then the batch's stored files are removed. Every step
+    is idempotent, so re-running a batch after a crash is safe.
+    """
+
+    def __init__(self, batch_size: int = DELETE_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active_jobs: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def start(self, resume: bool = INGESTION_RESUME_ON_STARTUP) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deletion-job")
+        if resume:
+            self.resume_pending_jobs()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # The running job stops after its current batch and releases its lock.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, job_id: str, checksums: List[str]) -> None:
+        """Persist a deletion job as queued and schedule it."""
+        write_job(job_id, self._job(job_id, checksums, "queued", self._summary(checksums)))
+        self._dispatch(job_id, checksums)
+
+    def resume_pending_jobs(self) -> List[str]:
+        resumed = []
+        for job in list_jobs({"queued", "processing"}):
+            if job.get("type") != "delete":
+                continue
+            job_id = job.get("job_id")
+            if job_id and self._dispatch(job_id, job.get("checksums", []) or []):
+                resumed.append(job_id)
+        return resumed
+
+    def _dispatch(self, job_id: str, checksums: List[str]) -> bool:
+        if self._executor is None:
+            self.start(resume=False)
+        with self._lock:
+            if job_id in self._active_jobs:
+                return False
+            self._active_jobs.add(job_id)
+        self._executor.submit(self._run_job, job_id, checksums)
+        return True
+
+    @staticmethod
+    def _job(job_id: str, checksums: List[str], status: str, summary: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+        return {"job_id": job_id, "type": "delete", "status": status, "items": [], "checksums": checksums, "summary": summary, **extra}
+
+    @staticmethod
+    def _summary(checksums: List[str]) -> Dict[str, Any]:
+        return {"total": len(checksums), "processed": 0, "deleted_points": 0, "removed_files": 0}
+
+    def _run_job(self, job_id: str, checksums: List[str]) -> None:
+        executor = self._executor
+        summary = self._summary(checksums)
+        if not claim_job(job_id):
+            with self._lock:
+                self._active_jobs.discard(job_id)
+            return
+        try:
+            try:
+                summary.update((read_job(job_id).get("summary") or {}))
+            except Exception:
+                pass
+            write_job(job_id, self._job(job_id, checksums, "processing", summary))
+
+            while summary["processed"] < len(checksums):
+                if self._executor is not executor:
+                    # Shutting down: leave the job as `processing` so it is resumed on next start.
+                    return
+                batch = checksums[summary["processed"]:summary["processed"] + self.batch_size]
+                summary["deleted_points"] += qdrant_service.delete_points_by_checksums(batch)
+                for checksum in batch:
+                    summary["removed_files"] += len(remove_files_by_checksum(checksum))
+                summary["processed"] += len(batch)
+                write_job(job_id, self._job(job_id, checksums, "processing", summary))
+
+            write_job(job_id, self._job(job_id, checksums, "completed", summary))
+        except Exception as e:
+            write_job(job_id, self._job(job_id, checksums, "failed", summary, error=str(e)))
+        finally:
+            release_job(job_id)
+            with self._lock:
+                self._active_jobs.discard(job_id)
+
+
+deletion_service = DeletionService()
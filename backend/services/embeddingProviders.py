@@ -0,0 +1,244 @@
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Any
+
+from helpers.embeding_helper import (
+    ensure_model_ready,
+    iter_embedding_batches_openai,
+    iter_embedding_batches_ollama,
+    get_openai_model_dim,
+    get_ollama_model_dim,
+)
+from services.embeddingServer import get_embedding_server
+from services.collectionSettings import CollectionSettingsStore, collection_settings
+from helpers.query_cache import query_embedding_cache
+from const.env_variables import (
+    EMBEDDING_PROVIDER,
+    EMBEDDING_MODEL_NAME,
+    OPENAI_EMBEDDING_MODEL,
+    OLLAMA_EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    QDRANT_COLLECTION,
+    EMBEDDING_WARMUP_BATCH_SIZE,
+)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into vectors for one embedding model.
+
+    `iter_batches` yields (indices, vectors) as batches complete, possibly out
+    of order, so ingestion can upsert early batches while later ones are still
+    being embedded; `embed` collects them in input order.
+    """
+
+    name = ""
+    default_model = ""
+
+    def __init__(self, model: Optional[str] = None, dimensions: Optional[int] = None):
+        self.model = model or self.default_model
+        if dimensions:
+            raise ValueError(f"The {self.name} provider does not support reduced dimensions")
+        self.dimensions = None
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}/{self.model}" + (f"@{self.dimensions}" if self.dimensions else "")
+
+    @abstractmethod
+    def dimension(self) -> int:
+        """Vector size of the model."""
+
+    @abstractmethod
+    def iter_batches(self, texts: List[str]) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        """Yield (indices, vectors) for `texts` as batches complete."""
+
+    def warmup(self) -> None:
+        """Load the model ahead of the first request. Blocking; run it off the event loop."""
+        self.dimension()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        async for indices, batch in self.iter_batches(texts):
+            for idx, vector in zip(indices, batch):
+                vectors[idx] = vector
+        return vectors
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    OpenAI embeddings. v3 models are Matryoshka-trained, so `dimensions` may
+    shorten their vectors (e.g. 1536 -> 512) at a small recall cost.
+    """
+
+    name = "openai"
+    default_model = OPENAI_EMBEDDING_MODEL
+
+    def __init__(self, model: Optional[str] = None, dimensions: Optional[int] = None):
+        super().__init__(model)
+        if dimensions:
+            full = get_openai_model_dim(self.model)
+            if not self.model.startswith("text-embedding-3-"):
+                raise ValueError(f"Model '{self.model}' does not support reduced dimensions")
+            if not 0 < dimensions <= full:
+                raise ValueError(f"dimensions must be between 1 and {full} for '{self.model}'")
+        self.dimensions = dimensions or None
+
+    def dimension(self) -> int:
+        return self.dimensions or get_openai_model_dim(self.model)
+
+    def iter_batches(self, texts: List[str]) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        return iter_embedding_batches_openai(texts, model=self.model, dimensions=self.dimensions)
+
+
+class SentenceTransformerEmbeddingProvider(EmbeddingProvider):
+    name = "sentence_transformers"
+    default_model = EMBEDDING_MODEL_NAME
+
+    def dimension(self) -> int:
+        return ensure_model_ready(self.model).get_sentence_embedding_dimension()
+
+    def warmup(self) -> None:
+        # Bypass the embedding cache so the forward pass actually runs once.
+        ensure_model_ready(self.model).encode(
+            ["warmup"] * max(1, EMBEDDING_WARMUP_BATCH_SIZE),
+            show_progress_bar=False,
+            normalize_embeddings=True,
+        )
+
+    async def iter_batches(self, texts: List[str]) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        if texts:
+            yield list(range(len(texts))), await get_embedding_server(self.model).embed(texts)
+
+
+class OllamaEmbeddingProvider(EmbeddingProvider):
+    name = "ollama"
+    default_model = OLLAMA_EMBEDDING_MODEL
+
+    def dimension(self) -> int:
+        return get_ollama_model_dim(self.model)
+
+    def iter_batches(self, texts: List[str]) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        return iter_embedding_batches_ollama(texts, model=self.model)
+
+
+PROVIDERS = {
+    provider.name: provider
+    for provider in (OpenAIEmbeddingProvider, SentenceTransformerEmbeddingProvider, OllamaEmbeddingProvider)
+}
+
+
+class EmbeddingProviderRegistry:
+    """
+    Which embedding provider and model each collection uses.
+
+    Assignments live in the shared collection settings, so the API process
+    and the ingestion workers agree on them. Collections without an entry use
+    `EMBEDDING_PROVIDER` with that provider's default model.
+    """
+
+    def __init__(self, settings: CollectionSettingsStore = collection_settings, default_provider: str = EMBEDDING_PROVIDER):
+        if default_provider not in PROVIDERS:
+            raise ValueError(f"Unknown embedding provider: {default_provider}")
+        self.settings = settings
+        self.default_provider = default_provider
+        self._lock = threading.Lock()
+        self._instances: Dict[Tuple[str, str, Optional[int]], EmbeddingProvider] = {}
+        self._status: Dict[str, dict] = {}
+
+    def spec(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+        entry = self.settings.get(collection_name or QDRANT_COLLECTION, "embedding")
+        name = entry.get("provider") or self.default_provider
+        spec = {"provider": name, "model": entry.get("model") or PROVIDERS[name].default_model}
+        dimensions = entry.get("dimensions") or (EMBEDDING_DIMENSIONS if not entry and name == "openai" else None)
+        if dimensions:
+            spec["dimensions"] = dimensions
+        return spec
+
+    def assign(self, collection_name: str, provider: str, model: Optional[str] = None, dimensions: Optional[int] = None) -> Dict[str, Any]:
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown embedding provider '{provider}'. Available: {', '.join(PROVIDERS)}")
+        instance = PROVIDERS[provider](model, dimensions)
+        embedding = {"provider": provider, "model": instance.model}
+        if dimensions:
+            embedding["dimensions"] = dimensions
+        return self.settings.set(collection_name, "embedding", embedding)
+
+    def get(self, collection_name: Optional[str] = None) -> EmbeddingProvider:
+        return self._instance(self.spec(collection_name))
+
+    def _instance(self, spec: Dict[str, Any]) -> EmbeddingProvider:
+        key = (spec["provider"], spec["model"], spec.get("dimensions"))
+        with self._lock:
+            provider = self._instances.get(key)
+            if provider is None:
+                provider = self._instances[key] = PROVIDERS[spec["provider"]](spec["model"], spec.get("dimensions"))
+        return provider
+
+    def configured(self) -> List[Dict[str, str]]:
+        """Distinct provider/model pairs used by the default collection and every configured one."""
+        names = [QDRANT_COLLECTION] + [name for name in self.settings.collections() if name != QDRANT_COLLECTION]
+        specs = {}
+        for name in names:
+            spec = self.spec(name)
+            specs.setdefault((spec["provider"], spec["model"], spec.get("dimensions")), spec)
+        return list(specs.values())
+
+    async def warmup(self) -> Dict[str, dict]:
+        """
+        Load and exercise every configured embedding model once.
+
+        Failures are recorded rather than raised, so a missing local model
+        degrades `/health` instead of preventing the API from starting.
+        """
+        for spec in self.configured():
+            provider = self._instance(spec)
+            self._status[provider.cache_key] = {"status": "loading"}
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(provider.warmup)
+                self._status[provider.cache_key] = {
+                    "status": "ready",
+                    "warmup_ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+            except Exception as e:
+                self._status[provider.cache_key] = {"status": "error", "detail": str(e)}
+        return self.readiness()
+
+    def readiness(self) -> Dict[str, object]:
+        return {
+            "ready": all(entry["status"] == "ready" for entry in self._status.values()),
+            "models": dict(self._status),
+        }
+
+
+embedding_providers = EmbeddingProviderRegistry()
+
+
+def get_embedding_provider(collection_name: Optional[str] = None) -> EmbeddingProvider:
+    return embedding_providers.get(collection_name)
+
+
+async def embed_query(query: str, collection_name: Optional[str] = None) -> List[float]:
+    """
+    Embed a search query with the provider of the collection being searched,
+    reusing recent embeddings of the same normalized query.
+
+    Args:
+        query: The user query
+        collection_name: Collection the vector will be searched in (default: QDRANT_COLLECTION)
+
+    Returns:
+        List[float]: The query embedding vector
+    """
+    provider = get_embedding_provider(collection_name)
+    cached = query_embedding_cache.get(query, provider.cache_key)
+    if cached is not None:
+        return cached
+    # The normalized query is only the cache key; the user's text is embedded
+    # as written so case-sensitive names and part numbers keep their meaning.
+    [vector] = await provider.embed([query])
+    query_embedding_cache.put(query, provider.cache_key, vector)
+    return vector
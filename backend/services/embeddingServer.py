@@ -0,0 +1,176 @@
+import time
+import queue
+import asyncio
+import threading
+from typing import List, Dict, Optional, Tuple
+
+from helpers.embeding_helper import embed_texts
+from const.env_variables import EMBEDDING_SERVER_MAX_BATCH, EMBEDDING_SERVER_MAX_WAIT_MS
+
+_Request = Tuple[List[str], asyncio.AbstractEventLoop, asyncio.Future]
+
+
+def _resolve(future: asyncio.Future, result=None, error: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result=None, error: Optional[BaseException] = None) -> None:
+    try:
+        loop.call_soon_threadsafe(_resolve, future, result, error)
+    except RuntimeError:
+        # The caller's loop is closed; nobody is waiting for this result any more.
+        pass
+
+
+class EmbeddingServer:
+    """
+    Runs a local SentenceTransformer on a dedicated thread with dynamic micro-batching.
+
+    Callers `await embed(texts)` from any event loop. The worker thread takes
+    the first queued request, keeps collecting requests for up to
+    `max_wait_ms` or until `max_batch_size` texts are gathered, encodes them
+    in one `model.encode` call and hands each caller its slice through
+    `loop.call_soon_threadsafe`. Concurrent searches are therefore served by
+    one forward pass instead of queueing behind each other, and the event
+    loop never blocks on inference.
+    """
+
+    def __init__(self, model_name: str, max_batch_size: int = EMBEDDING_SERVER_MAX_BATCH, max_wait_ms: float = EMBEDDING_SERVER_MAX_WAIT_MS):
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"embedding-server:{self.model_name}", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((list(texts), loop, future))
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _run(self) -> None:
+        batch: List[_Request] = []
+        try:
+            while True:
+                batch, stopping = self._collect()
+                if batch:
+                    try:
+                        self._process(batch)
+                    except Exception as e:
+                        self._fail(batch, e)
+                batch = []
+                if stopping:
+                    return
+        except BaseException as e:
+            # Never leave callers waiting on a thread that is gone: fail its
+            # current batch and everything still queued.
+            error = RuntimeError(f"Embedding server for '{self.model_name}' stopped: {e!r}")
+            self._fail(batch, error)
+            while True:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    self._fail([request], error)
+            raise
+
+    def _collect(self) -> Tuple[List[_Request], bool]:
+        """Wait for a request, then gather more for up to `max_wait`. Returns (batch, stopping)."""
+        request = self._queue.get()
+        if request is None:
+            return [], True
+        batch = [request]
+        size = len(request[0])
+        deadline = time.monotonic() + self.max_wait
+        stopping = False
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                stopping = True
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch, stopping
+
+    def _fail(self, batch: List[_Request], error: BaseException) -> None:
+        for _, loop, future in batch:
+            _deliver(loop, future, None, error)
+
+    def _process(self, batch: List[_Request]) -> None:
+        # Skip callers that gave up (e.g. a cancelled request) before encoding their texts.
+        batch = [request for request in batch if not request[2].cancelled()]
+        if not batch:
+            return
+        texts = [text for request in batch for text in request[0]]
+        try:
+            vectors = embed_texts(texts, model_name=self.model_name)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        start = 0
+        for request_texts, loop, future in batch:
+            end = start + len(request_texts)
+            _deliver(loop, future, vectors[start:end])
+            start = end
+
+
+_servers: Dict[str, EmbeddingServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_embedding_server(model_name: str) -> EmbeddingServer:
+    with _servers_lock:
+        server = _servers.get(model_name)
+        if server is None:
+            server = _servers[model_name] = EmbeddingServer(model_name)
+        return server
+
+
+def embedding_server_stats() -> Dict[str, Dict[str, float]]:
+    return {name: server.stats() for name, server in list(_servers.items())}
+
+
+def stop_embedding_servers() -> None:
+    for server in list(_servers.values()):
+        server.stop(timeout=5.0)
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import httpx
+from typing import Awaitable, Callable, Dict, Tuple
+from const.env_variables import (
+    OLLAMA_BASE_URL,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+    OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_TIMEOUT,
+    OLLAMADB_BASE_URL,
+)
+
+
+def close_on_loop(close: Callable[[], Awaitable[None]], loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Close a loop-bound client that is being replaced by one for another loop.
+
+    Its connections belong to `loop`, so `close()` is scheduled there while
+    that loop is still running; a stopped loop's connections are dropped.
+    """
+    if loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(close(), loop)
+
+
+class HttpClientRegistry:
+    """
+    Application-scoped `httpx.AsyncClient`s, one per upstream.
+
+    Each upstream gets its own connection pool limits, keep-alive and default
+    timeout. Clients are opened on app startup and closed on shutdown; a
+    client requested from another event loop (e.g. an ingestion worker) is
+    created lazily for that loop, since httpx pools are loop-bound, and the
+    client it replaces is closed on its own loop.
+    Blocking code running off the event loop uses `get_sync`, a pooled
+    `httpx.Client` with the same configuration.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, dict] = {}
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._sync_lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        base_url: str = "",
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+    ) -> None:
+        self._configs[name] = {
+            "base_url": base_url,
+            "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(name)
+        if entry is None or entry[1] is not loop or entry[0].is_closed:
+            if entry is not None and not entry[0].is_closed:
+                close_on_loop(entry[0].aclose, entry[1])
+            client = httpx.AsyncClient(**self._configs[name])
+            self._clients[name] = (client, loop)
+            return client
+        return entry[0]
+
+    def get_sync(self, name: str) -> httpx.Client:
+        with self._sync_lock:
+            client = self._sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = self._sync_clients[name] = httpx.Client(**self._configs[name])
+            return client
+
+    async def startup(self) -> None:
+        for name in self._configs:
+            self.get(name)
+
+    async def shutdown(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client, _ in clients.values():
+            await client.aclose()
+        with self._sync_lock:
+            sync_clients, self._sync_clients = self._sync_clients, {}
+        for client in sync_clients.values():
+            client.close()
+
+
+http_clients = HttpClientRegistry()
+http_clients.register(
+    "ollama",
+    base_url=OLLAMA_BASE_URL,
+    timeout=OLLAMA_TIMEOUT,
+    max_connections=OLLAMA_MAX_CONNECTIONS,
+    max_keepalive_connections=OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+)
+http_clients.register("ollamadb", base_url=OLLAMADB_BASE_URL, timeout=30.0)
+
+
+def ollama_client() -> httpx.AsyncClient:
+    return http_clients.get("ollama")
+
+
+def ollama_sync_client() -> httpx.Client:
+    return http_clients.get_sync("ollama")
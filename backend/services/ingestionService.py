@@ -0,0 +1,224 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Set
+
+from helpers.job_helper import write_job, read_job, list_jobs, process_files, summarize, claim_job, release_job
+from const.env_variables import (
+    INGESTION_WORKERS,
+    INGESTION_MAX_CONCURRENT_JOBS,
+    INGESTION_FILES_PER_JOB,
+    INGESTION_FILES_PER_WORKER,
+    INGESTION_RESUME_ON_STARTUP,
+    INGESTION_MAX_WORKER_CRASHES,
+)
+
+
+class IngestionService:
+    """
+    Runs ingestion jobs outside of the API request cycle.
+
+    The `.jobs` directory is the durable queue: every job is persisted as
+    `queued` before it is dispatched, progress is written after each file,
+    and jobs left `queued` or `processing` by a crashed process are picked up
+    again on startup. Files are chunked and embedded in a pool of worker
+    processes; each job keeps at most `files_per_job` files in flight so a
+    single bulk upload cannot monopolize the pool. Files are handed to a
+    worker in batches of `files_per_worker`, which the worker ingests
+    concurrently on its event loop to overlap their network I/O.
+
+    A job is claimed with a lock file before it runs, so a process started
+    while another still runs the job (e.g. on a code reload) leaves it alone.
+    A worker that dies (e.g. out of memory) breaks the pool; it is replaced
+    and the job is requeued, resuming after its completed files, up to
+    `max_worker_crashes` times. Shutdown cancels queued batches and leaves
+    interrupted jobs to be resumed on the next start.
+    """
+
+    def __init__(
+        self,
+        workers: int = INGESTION_WORKERS,
+        max_concurrent_jobs: int = INGESTION_MAX_CONCURRENT_JOBS,
+        files_per_job: int = INGESTION_FILES_PER_JOB,
+        files_per_worker: int = INGESTION_FILES_PER_WORKER,
+        max_worker_crashes: int = INGESTION_MAX_WORKER_CRASHES,
+    ):
+        self.workers = max(1, workers)
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.files_per_job = max(1, files_per_job)
+        self.files_per_worker = max(1, min(files_per_worker, self.files_per_job))
+        self.max_worker_crashes = max(0, max_worker_crashes)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._active_jobs: Set[str] = set()
+        self._worker_crashes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def start(self, resume: bool = INGESTION_RESUME_ON_STARTUP) -> None:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+                self._dispatcher = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_jobs,
+                    thread_name_prefix="ingestion-job",
+                )
+        if resume:
+            self.resume_pending_jobs()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            dispatcher, pool = self._dispatcher, self._pool
+            self._dispatcher, self._pool = None, None
+        if pool is not None:
+            # Batches already running finish; queued ones are cancelled. Their
+            # files are ingested when the job resumes, and point ids are
+            # deterministic, so anything upserted twice is simply overwritten.
+            pool.shutdown(wait=True, cancel_futures=True)
+        if dispatcher is not None:
+            # Job threads see the pool is gone and release their job locks.
+            dispatcher.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, job_id: str, storage_keys: List[str], force_reindex: bool = False) -> None:
+        """Persist a job as queued and hand it to the dispatcher."""
+        write_job(job_id, {"job_id": job_id, "status": "queued", "items": storage_keys, "force_reindex": force_reindex})
+        self._dispatch(job_id, storage_keys, force_reindex)
+
+    def resume_pending_jobs(self) -> List[str]:
+        """Re-dispatch jobs that were queued or interrupted mid-processing."""
+        resumed = []
+        for job in list_jobs({"queued", "processing"}):
+            if job.get("type", "ingest") != "ingest":
+                continue
+            job_id = job.get("job_id")
+            if job_id and self._dispatch(job_id, job.get("items", []) or [], bool(job.get("force_reindex"))):
+                resumed.append(job_id)
+        return resumed
+
+    def _dispatch(self, job_id: str, storage_keys: List[str], force_reindex: bool = False) -> bool:
+        if self._dispatcher is None:
+            self.start(resume=False)
+        with self._lock:
+            if job_id in self._active_jobs:
+                return False
+            self._active_jobs.add(job_id)
+        self._dispatcher.submit(self._run_job, job_id, storage_keys, force_reindex)
+        return True
+
+    def _replace_broken_pool(self, pool: ProcessPoolExecutor, job_id: str) -> bool:
+        """
+        Swap a broken pool for a fresh one (once, however many jobs notice).
+
+        Returns:
+            bool: Whether the job should be requeued, i.e. it has not yet
+            crashed a worker more than `max_worker_crashes` times.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = self._new_pool()
+            crashes = self._worker_crashes[job_id] = self._worker_crashes.get(job_id, 0) + 1
+        pool.shutdown(wait=False, cancel_futures=True)
+        return crashes <= self.max_worker_crashes
+
+    def _requeue(self, job_id: str, storage_keys: List[str], force_reindex: bool) -> None:
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return
+        with self._lock:
+            if job_id in self._active_jobs:
+                return
+            self._active_jobs.add(job_id)
+        try:
+            dispatcher.submit(self._run_job, job_id, storage_keys, force_reindex)
+        except RuntimeError:
+            # Shutting down: the job stays `processing` and is resumed on next start.
+            with self._lock:
+                self._active_jobs.discard(job_id)
+
+    def _completed_files(self, job_id: str) -> List[Dict[str, Any]]:
+        try:
+            job = read_job(job_id)
+        except Exception:
+            return []
+        return (job.get("summary") or {}).get("per_file", []) or []
+
+    def _run_job(self, job_id: str, storage_keys: List[str], force_reindex: bool = False) -> None:
+        pool = self._pool
+        job = {"job_id": job_id, "items": storage_keys, "force_reindex": force_reindex}
+        if pool is None or not claim_job(job_id):
+            # Shut down before the job started (it is resumed on next start), or claimed elsewhere.
+            with self._lock:
+                self._active_jobs.discard(job_id)
+            return
+        requeue = False
+        try:
+            per_file = self._completed_files(job_id)
+            done = {item["storage_key"] for item in per_file}
+            pending = [key for key in storage_keys if key not in done]
+
+            write_job(job_id, {**job, "status": "processing", "summary": summarize(per_file)})
+
+            error: Optional[str] = None
+            broken = False
+            in_flight: Dict[Future, List[str]] = {}
+            while ((pending and error is None) or in_flight) and not broken:
+                while pending and error is None and not broken and sum(map(len, in_flight.values())) < self.files_per_job:
+                    batch, pending = pending[:self.files_per_worker], pending[self.files_per_worker:]
+                    try:
+                        in_flight[pool.submit(process_files, job_id, batch, force_reindex)] = batch
+                    except BrokenProcessPool:
+                        broken = True
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool:
+                        # A worker died; every batch still in flight on this pool is lost with it.
+                        broken = True
+                        continue
+                    except Exception as e:
+                        error = error or f"{', '.join(batch)}: {str(e)}"
+                        continue
+                    for result in results:
+                        if "error" in result:
+                            error = error or f"{result['storage_key']}: {result['error']}"
+                        else:
+                            per_file.append(result)
+
+                if self._pool is None:
+                    # Shutting down: leave the job as `processing` so it is resumed on next start.
+                    return
+
+                write_job(job_id, {**job, "status": "processing", "summary": summarize(per_file)})
+
+            if broken:
+                if self._replace_broken_pool(pool, job_id):
+                    requeue = True
+                    return
+                error = error or f"A worker process crashed {self._worker_crashes[job_id]} times while ingesting this job"
+
+            if error is not None:
+                write_job(job_id, {**job, "status": "failed", "error": error, "summary": summarize(per_file)})
+            else:
+                write_job(job_id, {**job, "status": "completed", "summary": summarize(per_file)})
+        except Exception as e:
+            if self._pool is not None:
+                write_job(job_id, {**job, "status": "failed", "error": str(e)})
+        finally:
+            release_job(job_id)
+            with self._lock:
+                self._active_jobs.discard(job_id)
+                if not requeue:
+                    self._worker_crashes.pop(job_id, None)
+            if requeue:
+                self._requeue(job_id, storage_keys, force_reindex)
+
+
+ingestion_service = IngestionService()
@@ -1,7 +1,9 @@
+import json
 import httpx
 from fastapi import HTTPException
-from typing import List, Dict, Any
-from const.env_variables import OLLAMA_BASE_URL, OLLAMA_HOST, OLLAMA_PORT, INIT_MODEL_NAME_VAL, MODEL_NAME_VAL
+from typing import List, Dict, Any, AsyncIterator
+from const.env_variables import OLLAMA_HOST, OLLAMA_PORT, INIT_MODEL_NAME_VAL, MODEL_NAME_VAL
+from services.httpClients import ollama_client
 
 class OllamaService:
     def __init__(self):
@@ -28,19 +30,18 @@ class OllamaService:
             else:
                 payload = query_data
 
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json=payload,
+            response = await ollama_client().post(
+                "/api/chat",
+                json=payload,
+            )
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Failed to query Ollama model: {response.text}"
                 )
-                
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Failed to query Ollama model: {response.text}"
-                    )
-                
-                return response.json()
+            
+            return response.json()
                 
         except httpx.TimeoutException:
             print('Timeout exception')
@@ -61,6 +62,32 @@ class OllamaService:
                 detail=f"Error querying Ollama model: {str(e)}"
             )
 
+    async def stream_chat(self, query_data) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from Ollama, yielding message content deltas.
+
+        Leaving the generator early closes the upstream response, which makes
+        Ollama abort the generation.
+        """
+        payload = dict(query_data)
+        payload["stream"] = True
+        async with ollama_client().stream("POST", "/api/chat", json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Failed to query Ollama model: {body.decode(errors='ignore')}"
+                )
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                content = (data.get("message") or {}).get("content")
+                if content:
+                    yield content
+                if data.get("done"):
+                    break
+
     def _format_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """
         Format messages to match Ollama's expected format.
@@ -68,13 +95,14 @@ class OllamaService:
         return messages
 
     async def query_llm(prompt: object):
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json=prompt if isinstance(prompt, dict) else {"model": MODEL_NAME_VAL, "prompt": str(prompt)},
-                timeout=120,
-            )
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code,
-                                    detail=f"Failed to query LLM: {response.text}")
-            return response.json()
+        response = await ollama_client().post(
+            "/api/chat",
+            json=prompt if isinstance(prompt, dict) else {"model": MODEL_NAME_VAL, "prompt": str(prompt)},
+            timeout=120,
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code,
+                                detail=f"Failed to query LLM: {response.text}")
+        return response.json()
+
+ollama_service = OllamaService()
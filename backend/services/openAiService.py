@@ -1,10 +1,68 @@
-from openai import OpenAI
-from typing import List, Dict, Any, Optional
-from const.env_variables import OPENAI_API_KEY
+import asyncio
+import httpx
+from openai import AsyncOpenAI
+from services.httpClients import close_on_loop
+from typing import List, Dict, Any, Optional, AsyncIterator
+from const.env_variables import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_TIMEOUT,
+    OPENAI_MAX_RETRIES,
+    OPENAI_MAX_CONCURRENT_REQUESTS,
+)
 
 class OpenAIService:
-    def __init__(self):
-        self.service = OpenAI(api_key=OPENAI_API_KEY)
+    """
+    Thin wrapper around a shared `AsyncOpenAI` client.
+
+    The client keeps a pooled keep-alive HTTP connection set and retries 429
+    and 5xx responses with exponential backoff (honouring `Retry-After`).
+    In-flight requests are capped by a semaphore so bursts queue locally
+    instead of tripping the API rate limit.
+
+    Connection pools and semaphores are bound to an event loop, so the client
+    is created lazily for the loop that uses it and rebuilt if a different
+    loop (e.g. an ingestion worker) calls in later; the old client is then
+    closed on its own loop.
+    """
+
+    def __init__(self, max_concurrent_requests: int = OPENAI_MAX_CONCURRENT_REQUESTS):
+        self.max_concurrent_requests = max_concurrent_requests
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def service(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                close_on_loop(self._client.close, self._loop)
+            self._client = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                max_retries=OPENAI_MAX_RETRIES,
+                timeout=OPENAI_TIMEOUT,
+                http_client=httpx.AsyncClient(
+                    timeout=OPENAI_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
 
     async def query_model(
         self,
@@ -17,16 +75,46 @@ class OpenAIService:
         **kwargs
     ) -> Dict[str, Any]:
         try:
-
-            response = self.service.responses.create(
-                model=model,
-                input=messages
-            )
+            client = self.service
+            async with self._semaphore:
+                response = await client.responses.create(
+                    model=model,
+                    input=messages
+                )
 
             return response
-            
+
         except Exception as e:
-            raise Exception(f"Error querying OpenAI API: {str(e)}") 
+            raise Exception(f"Error querying OpenAI API: {str(e)}")
+
+    async def stream_model(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Yield output text deltas as the model produces them.
+
+        Closing the generator (e.g. when the HTTP client disconnects) closes
+        the upstream stream, so an abandoned generation stops consuming tokens.
+        """
+        client = self.service
+        async with self._semaphore:
+            try:
+                stream = await client.responses.create(
+                    model=model,
+                    input=messages,
+                    stream=True,
+                )
+            except Exception as e:
+                raise Exception(f"Error querying OpenAI API: {str(e)}")
+            try:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+            finally:
+                await stream.close()
 
     async def create_embedding(
         self,
@@ -38,13 +126,15 @@ class OpenAIService:
         Create embeddings for the provided input text using the specified model.
         """
         try:
-            response = self.service.embeddings.create(
-                input=input_text,
-                model=model,
-                **kwargs
-            )
+            client = self.service
+            async with self._semaphore:
+                response = await client.embeddings.create(
+                    input=input_text,
+                    model=model,
+                    **kwargs
+                )
             return response
         except Exception as e:
             raise Exception(f"Error creating embedding with OpenAI API: {str(e)}")
 
-open_ai_service = OpenAIService()
\ No newline at end of file
+open_ai_service = OpenAIService()
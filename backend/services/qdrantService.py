@@ -2,17 +2,128 @@ import uuid
 import os
 import asyncio
 import mimetypes
+from collections import Counter
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from qdrant_client import QdrantClient,  models as qmodels
+from qdrant_client import QdrantClient, AsyncQdrantClient, models as qmodels
 
-from helpers.embeding_helper import embed_texts, embed_texts_openai, get_model_dim
+from services.embeddingProviders import EmbeddingProvider, get_embedding_provider
 
-from const.env_variables import VECTOR_SIZE, QDRANT_COLLECTION_NAME, QDRANT_PORT, QDRANT_URL, QDRANT_COLLECTION, QDRANT_RECREATE_ON_MISMATCH
-from const.variables import scroll_limit
+from services.qdrantUpsertEngine import QdrantUpsertEngine
+from helpers.chunk_store import chunk_store
+from helpers.collection_stats import collection_stats
+from helpers.answer_cache import answer_cache
+from services.collectionProfiles import collection_profile, vectors_config, hnsw_config, quantization_config, search_params
+from services.sparseEmbeddings import SEARCH_MODES, sparse_model, uses_idf, embed_sparse_documents, embed_sparse_query
+
+from const.env_variables import VECTOR_SIZE, QDRANT_COLLECTION_NAME, QDRANT_PORT, QDRANT_URL, QDRANT_COLLECTION, QDRANT_RECREATE_ON_MISMATCH, QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT, HYBRID_FUSION, HYBRID_PREFETCH_LIMIT, SPARSE_EMBEDDING_MODEL
+from const.variables import qdrant_limit, scroll_limit, chunk_size as default_chunk_size, overlap as default_overlap
 
 _qdrant: Optional[QdrantClient] = None
+_async_qdrant: Optional[AsyncQdrantClient] = None
+_async_qdrant_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_indexed_collections: set = set()
+
+# Whether each collection actually has sparse vectors. The configured layout
+# only applies when a collection is created; an existing collection keeps the
+# layout it was created with, whatever QDRANT_HYBRID says now.
+_hybrid_collections: Dict[str, bool] = {}
+_layout_warned: set = set()
+
+# Payload returned by searches. Chunk text and display-only metadata live in the
+# chunk store; `chunk_text` is still requested for points ingested before that.
+SEARCH_PAYLOAD_FIELDS = ["checksum_sha256", "filename", "chunk_index", "page_number", "source_type", "file_extension", "chunk_text"]
+
+POINT_ID_NAMESPACE = uuid.UUID("6f1c0f0e-3d8a-4c57-9a43-7f0f1a2b5c11")
+
+# Payload fields used in search and delete filters. Without an index Qdrant
+# scans payloads for filtered queries, so latency grows with the corpus.
+PAYLOAD_INDEXES: Dict[str, qmodels.PayloadSchemaType] = {
+    "checksum_sha256": qmodels.PayloadSchemaType.KEYWORD,
+    "filename": qmodels.PayloadSchemaType.KEYWORD,
+    "page_number": qmodels.PayloadSchemaType.INTEGER,
+    "source_type": qmodels.PayloadSchemaType.KEYWORD,
+    "file_extension": qmodels.PayloadSchemaType.KEYWORD,
+}
+
+# Hybrid collections store named vectors: the embedding model's dense vector
+# and a sparse (BM25/SPLADE) vector. Dense-only collections keep the unnamed vector.
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "sparse"
+
+FUSIONS = {
+    "rrf": qmodels.Fusion.RRF,
+    "dbsf": qmodels.Fusion.DBSF,
+}
+
+def vector_layout(profile: Dict[str, Any], size: int, distance: qmodels.Distance = qmodels.Distance.COSINE, sparse: Optional[str] = None) -> Dict[str, Any]:
+    """`create_collection` vector arguments, with a sparse vector alongside the dense one when `sparse` names a model."""
+    if not sparse:
+        return {"vectors_config": vectors_config(profile, size, distance)}
+    return {
+        "vectors_config": {DENSE_VECTOR_NAME: vectors_config(profile, size, distance)},
+        "sparse_vectors_config": {
+            SPARSE_VECTOR_NAME: qmodels.SparseVectorParams(
+                index=qmodels.SparseIndexParams(on_disk=profile["on_disk"]),
+                modifier=qmodels.Modifier.IDF if uses_idf(sparse) else None,
+            )
+        },
+    }
+
+def _dense_size(info) -> Optional[int]:
+    vectors = info.config.params.vectors
+    if isinstance(vectors, dict):
+        return vectors[DENSE_VECTOR_NAME].size if DENSE_VECTOR_NAME in vectors else None
+    return vectors.size
+
+def collection_is_hybrid(client: QdrantClient, collection_name: str) -> bool:
+    """
+    Whether a collection stores named dense + sparse vectors.
+
+    When this disagrees with the configured sparse model the collection is
+    used as it is and a migration notice is logged once; points are never
+    dropped to change the layout.
+    """
+    if collection_name not in _hybrid_collections:
+        info = client.get_collection(collection_name)
+        _hybrid_collections[collection_name] = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+    hybrid = _hybrid_collections[collection_name]
+    if hybrid != bool(sparse_model(collection_name)) and collection_name not in _layout_warned:
+        _layout_warned.add(collection_name)
+        if hybrid:
+            print(f"Qdrant collection '{collection_name}' has sparse vectors but hybrid search is not configured; "
+                  f"it keeps indexing them. Recreate the collection and re-ingest to make it dense-only.")
+        else:
+            print(f"Qdrant collection '{collection_name}' has no sparse vectors; searching it dense-only. "
+                  f"Recreate the collection with hybrid enabled and re-ingest to use hybrid search.")
+    return hybrid
+
+async def sparse_query_vector(query: str, collection_name: Optional[str] = None, mode: Optional[str] = None) -> Optional[qmodels.SparseVector]:
+    """
+    Sparse leg of a search, or None for a dense-only search.
+
+    `mode` "auto" (the default) searches hybrid whenever the collection has
+    sparse vectors, "dense" never does, and "hybrid" requires them. What counts
+    is the collection's actual layout, not only its configuration: a dense
+    collection with hybrid configured is searched dense-only.
+    """
+    mode = mode or "auto"
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'. Available: {', '.join(SEARCH_MODES)}")
+    if mode == "dense":
+        return None
+    collection = collection_name or QDRANT_COLLECTION
+    model = sparse_model(collection)
+    hybrid = model is not None and await asyncio.to_thread(
+        lambda: collection_is_hybrid(QdrantService.ensure_qdrant_ready(), collection)
+    )
+    if not hybrid:
+        if mode == "hybrid":
+            raise ValueError(f"Collection '{collection}' has no sparse vectors; create it with hybrid=true")
+        return None
+    return await asyncio.to_thread(embed_sparse_query, query, model)
 
 def parse_storage_key(storage_key: str) -> dict:
     parts = storage_key.split(os.sep)
@@ -21,52 +132,227 @@ def parse_storage_key(storage_key: str) -> dict:
     a, b, checksum, filename = parts[-4:]
     return {"checksum": checksum, "filename": filename}
 
+def chunk_point_id(checksum: str, filename: str, chunk_index: int, chunk_size: int = default_chunk_size, overlap: int = default_overlap) -> str:
+    """
+    Deterministic point id for a chunk, so re-ingesting the same file with the
+    same chunking parameters overwrites its points instead of duplicating them.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{checksum}/{filename}:{chunk_size}:{overlap}:{chunk_index}"))
+
 class QdrantService:
     def __init__(self, host='localhost', port=6333, collection_name=QDRANT_COLLECTION_NAME, vector_size=VECTOR_SIZE):
         self.collection_name = collection_name
         self.client = QdrantClient(host=host, port=port)
 
-    def ensure_qdrant_ready(use_openai: bool = False) -> QdrantClient:
-        """Zapewnia istnienie kolekcji z właściwym wymiarem (= wymiar modelu)."""
+    def ensure_qdrant_ready() -> QdrantClient:
+        """Zapewnia istnienie kolekcji z właściwym wymiarem (= wymiar modelu kolekcji)."""
         global _qdrant
         if _qdrant is None:
-            _qdrant = QdrantClient(url=QDRANT_URL)
+            _qdrant = QdrantClient(url=QDRANT_URL, prefer_grpc=QDRANT_PREFER_GRPC, grpc_port=QDRANT_GRPC_PORT)
         
-        model_dim = get_model_dim(use_openai=use_openai)
+        model_dim = get_embedding_provider(QDRANT_COLLECTION).dimension()
+        profile = collection_profile(QDRANT_COLLECTION)
+        sparse = sparse_model(QDRANT_COLLECTION)
 
         if not _qdrant.collection_exists(QDRANT_COLLECTION):
             _qdrant.create_collection(
                 collection_name=QDRANT_COLLECTION,
-                vectors_config=qmodels.VectorParams(size=model_dim, distance=qmodels.Distance.COSINE),
+                **vector_layout(profile, model_dim, sparse=sparse),
+                hnsw_config=hnsw_config(profile),
+                quantization_config=quantization_config(profile),
                 on_disk_payload=True,
             )
+            _hybrid_collections[QDRANT_COLLECTION] = bool(sparse)
+            QdrantService.ensure_payload_indexes(_qdrant, QDRANT_COLLECTION)
         else:
             info = _qdrant.get_collection(QDRANT_COLLECTION)
 
-            current_size = (
-                info.config.params.vectors.size
-                if hasattr(info.config.params.vectors, "size")
-                else info.dict()["config"]["params"]["vectors"]["size"]
-            )
+            current_size = _dense_size(info)
+            _hybrid_collections[QDRANT_COLLECTION] = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
             if current_size != model_dim:
                 if QDRANT_RECREATE_ON_MISMATCH:
                     _qdrant.recreate_collection(
                         collection_name=QDRANT_COLLECTION,
-                        vectors_config=qmodels.VectorParams(size=model_dim, distance=qmodels.Distance.COSINE),
+                        **vector_layout(profile, model_dim, sparse=sparse),
+                        hnsw_config=hnsw_config(profile),
+                        quantization_config=quantization_config(profile),
                         on_disk_payload=True,
                     )
+                    _indexed_collections.discard(QDRANT_COLLECTION)
+                    _hybrid_collections[QDRANT_COLLECTION] = bool(sparse)
                 else:
                     raise RuntimeError(
                         f"Qdrant collection '{QDRANT_COLLECTION}' ma size={current_size}, a model {model_dim}. "
                         f"Ustaw QDRANT_RECREATE_ON_MISMATCH=true albo dostosuj kolekcję/model."
                     )
+            QdrantService.ensure_payload_indexes(_qdrant, QDRANT_COLLECTION)
         return _qdrant
 
+    def ensure_payload_indexes(client: QdrantClient, collection_name: str) -> List[str]:
+        """
+        Create any missing index from PAYLOAD_INDEXES on a collection.
+
+        Checked once per process and collection, so it doubles as the migration
+        for collections created before the indexes existed. Qdrant indexes the
+        points already stored while the collection stays searchable.
+
+        Returns:
+            List[str]: Fields that were newly indexed.
+        """
+        if collection_name in _indexed_collections:
+            return []
+        existing = client.get_collection(collection_name).payload_schema or {}
+        created = []
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema,
+                wait=True,
+            )
+            created.append(field_name)
+        _indexed_collections.add(collection_name)
+        return created
+
+    async def ensure_async_qdrant_ready() -> AsyncQdrantClient:
+        """
+        Async counterpart of `ensure_qdrant_ready` for the ingestion pipeline.
+
+        The collection check runs once per event loop; the async client is bound
+        to the loop that created it.
+        """
+        global _async_qdrant, _async_qdrant_loop
+        loop = asyncio.get_running_loop()
+        if _async_qdrant is None or _async_qdrant_loop is not loop:
+            await asyncio.to_thread(QdrantService.ensure_qdrant_ready)
+            _async_qdrant = AsyncQdrantClient(url=QDRANT_URL, prefer_grpc=QDRANT_PREFER_GRPC, grpc_port=QDRANT_GRPC_PORT)
+            _async_qdrant_loop = loop
+        return _async_qdrant
+
+    def search(
+        self,
+        query_vector: List[float],
+        collection_name: Optional[str] = None,
+        limit: int = qdrant_limit,
+        query_filter: Optional[qmodels.Filter] = None,
+        score_threshold: Optional[float] = None,
+        with_payload: Any = SEARCH_PAYLOAD_FIELDS,
+        ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        sparse_vector: Optional[qmodels.SparseVector] = None,
+        fusion: Optional[str] = None,
+        prefetch_limit: Optional[int] = None,
+    ) -> List[qmodels.ScoredPoint]:
+        """
+        Vector search using the collection's storage profile.
+
+        `ef` widens the HNSW beam, `exact` bypasses the index, and
+        `oversampling` overrides how many extra quantized candidates are
+        rescored with the original vectors.
+
+        With a `sparse_vector` the dense and sparse legs are prefetched and
+        fused server-side (`fusion`: rrf or dbsf) in one query; each leg
+        returns `prefetch_limit` candidates. Fused scores are rank-based, so
+        `score_threshold` then applies to the dense leg. Collections without
+        sparse vectors ignore `sparse_vector` and are searched dense-only.
+        """
+        collection = collection_name or QDRANT_COLLECTION
+        client = QdrantService.ensure_qdrant_ready()
+        QdrantService.ensure_payload_indexes(client, collection)
+        params = search_params(collection_profile(collection), ef=ef, exact=exact, oversampling=oversampling)
+        hybrid = collection_is_hybrid(client, collection)
+
+        if sparse_vector is None or not hybrid:
+            return client.search(
+                collection_name=collection,
+                query_vector=qmodels.NamedVector(name=DENSE_VECTOR_NAME, vector=query_vector) if hybrid else query_vector,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=with_payload,
+                score_threshold=score_threshold,
+                search_params=params,
+            )
+
+        if (fusion or HYBRID_FUSION) not in FUSIONS:
+            raise ValueError(f"Unknown fusion '{fusion or HYBRID_FUSION}'. Available: {', '.join(FUSIONS)}")
+        candidates = max(limit, prefetch_limit or HYBRID_PREFETCH_LIMIT)
+        response = client.query_points(
+            collection_name=collection,
+            prefetch=[
+                qmodels.Prefetch(query=query_vector, using=DENSE_VECTOR_NAME, filter=query_filter, params=params, score_threshold=score_threshold, limit=candidates),
+                qmodels.Prefetch(query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=candidates),
+            ],
+            query=qmodels.FusionQuery(fusion=FUSIONS[fusion or HYBRID_FUSION]),
+            limit=limit,
+            with_payload=with_payload,
+        )
+        return response.points
+
+    def hydrate(self, hits: List[qmodels.ScoredPoint]) -> List[Dict[str, Any]]:
+        """
+        Full chunk records for search hits: the stored chunk text and metadata
+        merged with each hit's payload, in hit order.
+        """
+        records = chunk_store.get_many([str(hit.id) for hit in hits])
+        return [{**records.get(str(hit.id), {}), **(hit.payload or {})} for hit in hits]
+
     def get_collections(self) -> List[str]:
         """Get list of all collection names."""
         return [collection.name for collection in self.client.get_collections().collections]
 
-    def upsert_chunks_to_qdrant(self, storage_key: str, chunks: List[str], metadata_list: Optional[List[Dict[str, Any]]] = None, job_id: Optional[str] = None, use_openai: bool = True) -> int:
+    def is_file_indexed(self, storage_key: str, chunk_size: int = default_chunk_size, overlap: int = default_overlap) -> bool:
+        """
+        Check whether a file was fully ingested with the given chunking parameters.
+
+        The first chunk's point carries an `ingestion_complete` flag that is only
+        set once every chunk of the file has been upserted.
+        """
+        info = parse_storage_key(storage_key)
+        client = QdrantService.ensure_qdrant_ready()
+        points = client.retrieve(
+            collection_name=QDRANT_COLLECTION,
+            ids=[chunk_point_id(info["checksum"], info["filename"], 0, chunk_size, overlap)],
+            with_payload=["ingestion_complete"],
+            with_vectors=False,
+        )
+        return bool(points and (points[0].payload or {}).get("ingestion_complete"))
+
+    async def record_chunk_counts(self, storage_key: str, chunk_counts: Counter) -> None:
+        """Replace a file's statistics with the chunk counts gathered by `upsert_chunks_to_qdrant`."""
+        info = parse_storage_key(storage_key)
+        await asyncio.to_thread(collection_stats.add_chunks, QDRANT_COLLECTION, info["checksum"], info["filename"], chunk_counts.elements(), True)
+
+    async def mark_file_indexed(self, storage_key: str, chunk_size: int = default_chunk_size, overlap: int = default_overlap) -> None:
+        """Flag a file as fully ingested once all of its chunks have been upserted."""
+        info = parse_storage_key(storage_key)
+        # Answers cached while the file was being ingested saw only part of it.
+        await asyncio.to_thread(answer_cache.invalidate_checksums, [info["checksum"]])
+        client = await QdrantService.ensure_async_qdrant_ready()
+        await client.set_payload(
+            collection_name=QDRANT_COLLECTION,
+            payload={"ingestion_complete": True},
+            points=[chunk_point_id(info["checksum"], info["filename"], 0, chunk_size, overlap)],
+            wait=True,
+        )
+
+    async def upsert_chunks_to_qdrant(self, storage_key: str, chunks: List[str], metadata_list: Optional[List[Dict[str, Any]]] = None, job_id: Optional[str] = None, provider: Optional[EmbeddingProvider] = None, chunk_size: int = default_chunk_size, overlap: int = default_overlap, start_index: int = 0, mark_complete: bool = True, upserter: Optional[QdrantUpsertEngine] = None, chunk_counts: Optional[Counter] = None) -> int:
+        """
+        Embed and upsert a file's chunks.
+
+        `chunks` may be a window of a larger file: `start_index` is the file-level
+        index of its first chunk, and `mark_complete=False` defers the
+        `ingestion_complete` flag until the caller has upserted every window.
+        Passing a shared `upserter` lets batches from consecutive windows stay in
+        flight; the caller must then `flush()` it before marking the file complete.
+        Its points are not acknowledged yet on return, so the window's chunks are
+        added to `chunk_counts` instead of the collection statistics; the caller
+        records them with `record_chunk_counts` once the flush succeeds.
+        Chunks are embedded with the collection's provider unless `provider` is given;
+        hybrid collections also get each chunk's sparse vector.
+        """
         if not chunks:
             return 0
 
@@ -75,48 +361,88 @@ class QdrantService:
         filename = info["filename"]
         ctype, _ = mimetypes.guess_type(filename)
 
-        if use_openai:
-            vectors = asyncio.run(embed_texts_openai(chunks))
-        else:
-            vectors = embed_texts(chunks)
-        
-        if not vectors:
-            return 0
-
-        client = QdrantService.ensure_qdrant_ready(use_openai=use_openai)
-
-        points = []
-        for idx, (vec, text) in enumerate(zip(vectors, chunks)):
-            chunk_metadata = metadata_list[idx] if metadata_list and idx < len(metadata_list) else {}
-            
-            payload = {
-                "checksum_sha256": checksum,
+        client = await QdrantService.ensure_async_qdrant_ready()
+
+        file_extension = os.path.splitext(filename)[1].lower()
+        uploaded_at = datetime.utcnow().isoformat()
+        point_ids = [chunk_point_id(checksum, filename, start_index + idx, chunk_size, overlap) for idx in range(len(chunks))]
+        chunk_metadata = [
+            metadata_list[idx] if metadata_list and idx < len(metadata_list) else {}
+            for idx in range(len(chunks))
+        ]
+
+        # Text goes to the chunk store before its point exists, so a search never
+        # returns a point whose text cannot be hydrated.
+        records = []
+        for idx, text in enumerate(chunks):
+            records.append((point_ids[idx], checksum, filename, text, {
                 "storage_key": storage_key,
-                "filename": filename,
                 "content_type": ctype or "application/octet-stream",
                 "source": "upload",
-                "chunk_index": idx,
-                "chunk_text": text,
                 "chunk_char_count": len(text),
                 "job_id": job_id,
-                "page_number": chunk_metadata.get("page_number"),
-                "source_type": chunk_metadata.get("source_type", "unknown"),
-                "chunk_size": chunk_metadata.get("chunk_size", len(text)),
-                "file_extension": os.path.splitext(filename)[1].lower(),
-                "upload_timestamp": datetime.utcnow().isoformat(),
+                "chunk_size": chunk_metadata[idx].get("chunk_size", len(text)),
+                "upload_timestamp": uploaded_at,
                 "chunk_word_count": len(text.split()),
                 "chunk_sentence_count": len([s for s in text.split('.') if s.strip()]),
-            }
-            points.append(qmodels.PointStruct(id=str(uuid.uuid4()), vector=vec, payload=payload))
+            }))
+        await asyncio.to_thread(chunk_store.put_many, records)
+        if start_index == 0:
+            await asyncio.to_thread(answer_cache.invalidate_checksums, [checksum])
+
+        hybrid = await asyncio.to_thread(lambda: collection_is_hybrid(QdrantService.ensure_qdrant_ready(), QDRANT_COLLECTION))
+        sparse = sparse_model(QDRANT_COLLECTION) or SPARSE_EMBEDDING_MODEL
+        sparse_vectors = await asyncio.to_thread(embed_sparse_documents, chunks, sparse) if hybrid else None
+
+        def build_points(indices: List[int], vectors: List[List[float]]) -> List[qmodels.PointStruct]:
+            points = []
+            for idx, vec in zip(indices, vectors):
+                payload = {
+                    "checksum_sha256": checksum,
+                    "filename": filename,
+                    "chunk_index": start_index + idx,
+                    "page_number": chunk_metadata[idx].get("page_number"),
+                    "source_type": chunk_metadata[idx].get("source_type", "unknown"),
+                    "file_extension": file_extension,
+                }
+                if sparse_vectors is not None:
+                    vec = {DENSE_VECTOR_NAME: vec, SPARSE_VECTOR_NAME: sparse_vectors[idx]}
+                points.append(qmodels.PointStruct(id=point_ids[idx], vector=vec, payload=payload))
+            return points
+
+        engine = upserter or QdrantUpsertEngine(client, QDRANT_COLLECTION)
+
+        upserted = await self._embed_and_upsert(engine, provider or get_embedding_provider(QDRANT_COLLECTION), chunks, build_points)
+
+        keys = Counter((metadata.get("source_type", "unknown"), file_extension, metadata.get("page_number")) for metadata in chunk_metadata)
+        if upserter is None:
+            await engine.flush()
+            # Counted only once the points are upserted, so a failed window is
+            # not counted. The first window of a file replaces its counts, so
+            # re-ingesting does not double them.
+            await asyncio.to_thread(collection_stats.add_chunks, QDRANT_COLLECTION, checksum, filename, keys.elements(), start_index == 0)
+        elif chunk_counts is not None:
+            chunk_counts.update(keys)
+        if mark_complete:
+            await self.mark_file_indexed(storage_key, chunk_size, overlap)
+        return upserted
+
+    async def _embed_and_upsert(self, engine: QdrantUpsertEngine, provider: EmbeddingProvider, chunks: List[str], build_points) -> int:
+        """Upsert each embedding batch as soon as it completes, while later batches are still in flight."""
+        upserted = 0
+        async for indices, vectors in provider.iter_batches(chunks):
+            points = build_points(indices, vectors)
+            await engine.add(points)
+            upserted += len(points)
+        return upserted
 
-        for i in range(0, len(points), 64):
-            client.upsert(collection_name=QDRANT_COLLECTION, points=points[i:i + 64], wait=True)
-        return len(points)
-        
     def delete_points_by_checksum_and_filename(self, checksum_sha256: str, filename: str) -> int:
         """
         Remove all Qdrant points matching the given checksum_sha256 and filename.
 
+        The filter is evaluated server-side in a single delete, so no point ids
+        are transferred and there is no cap on the number of points removed.
+
         Args:
             checksum_sha256 (str): SHA-256 checksum to match.
             filename (str): Filename to match.
@@ -127,8 +453,6 @@ class QdrantService:
         if not checksum_sha256 or not filename:
             raise ValueError("Both checksum_sha256 and filename are required.")
 
-        client = QdrantService.ensure_qdrant_ready(use_openai=True)
-
         filter_condition = qmodels.Filter(
             must=[
                 qmodels.FieldCondition(
@@ -141,27 +465,105 @@ class QdrantService:
                 ),
             ]
         )
+        deleted = self._delete_by_filter(filter_condition)
+        chunk_store.delete_file(checksum_sha256, filename)
+        collection_stats.remove_file(QDRANT_COLLECTION, checksum_sha256, filename)
+        answer_cache.invalidate_checksums([checksum_sha256])
+        return deleted
 
-        scroll_res = client.scroll(
-            collection_name=QDRANT_COLLECTION,
-            scroll_filter=filter_condition,
-            with_payload=False,
-            with_vectors=False,
-            limit=scroll_limit  
-        )
-        point_ids = [point.id for point in scroll_res[0]]
+    def delete_points_by_checksums(self, checksums: List[str]) -> int:
+        """
+        Remove every point, stored chunk, counter and cached answer of the given documents in one delete.
 
-        if not point_ids:
+        Returns:
+            int: Number of points deleted.
+        """
+        if not checksums:
+            return 0
+        filter_condition = qmodels.Filter(
+            must=[qmodels.FieldCondition(key="checksum_sha256", match=qmodels.MatchAny(any=list(checksums)))]
+        )
+        deleted = self._delete_by_filter(filter_condition)
+        chunk_store.delete_checksums(checksums)
+        collection_stats.remove_checksums(QDRANT_COLLECTION, checksums)
+        answer_cache.invalidate_checksums(checksums)
+        return deleted
+
+    def _delete_by_filter(self, filter_condition: qmodels.Filter) -> int:
+        client = QdrantService.ensure_qdrant_ready()
+        # Exact counts are served from the payload index, so this stays cheap.
+        count = client.count(collection_name=QDRANT_COLLECTION, count_filter=filter_condition, exact=True).count
+        if not count:
             return 0
-
         client.delete(
             collection_name=QDRANT_COLLECTION,
-            points_selector=qmodels.PointIdsList(points=point_ids),
+            points_selector=qmodels.FilterSelector(filter=filter_condition),
             wait=True
         )
-        return len(point_ids)
+        return count
+
+    def collection_statistics(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Chunk statistics of a collection without scanning its points.
+
+        The point total comes from Qdrant's exact count and the source type and
+        extension breakdowns from payload-index facets; page and file
+        breakdowns come from the counters maintained during ingestion.
+        `counters_consistent` is False when the counters disagree with Qdrant,
+        e.g. for points ingested before the counters existed; run
+        `rebuild_statistics` once to backfill them.
+        """
+        collection = collection_name or QDRANT_COLLECTION
+        client = QdrantService.ensure_qdrant_ready()
+        QdrantService.ensure_payload_indexes(client, collection)
+        stats = collection_stats.summary(collection)
+        counted = stats["total_points"]
+        stats["total_points"] = client.count(collection_name=collection, exact=True).count
+        for key, field in (("source_types", "source_type"), ("file_extensions", "file_extension")):
+            try:
+                facets = client.facet(collection_name=collection, key=field, limit=1000, exact=True)
+            except Exception:
+                # Qdrant < 1.12 has no facet API; keep the counter breakdown.
+                continue
+            stats[key] = {str(hit.value): hit.count for hit in facets.hits}
+        stats["counted_points"] = counted
+        stats["counters_consistent"] = counted == stats["total_points"]
+        return stats
+
+    def rebuild_statistics(self, collection_name: Optional[str] = None) -> int:
+        """
+        Recount a collection's chunk counters from its points, page by page.
 
-    def create_collection(self, collection_name: str, vector_size: int, distance: str = "Cosine") -> None:
+        Returns:
+            int: Number of points counted.
+        """
+        collection = collection_name or QDRANT_COLLECTION
+        client = QdrantService.ensure_qdrant_ready()
+        counts: Counter = Counter()
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection,
+                with_payload=["checksum_sha256", "filename", "source_type", "file_extension", "page_number"],
+                with_vectors=False,
+                limit=scroll_limit,
+                offset=offset,
+            )
+            for point in points:
+                payload = point.payload or {}
+                counts[(
+                    payload.get("checksum_sha256") or "",
+                    payload.get("filename") or "",
+                    payload.get("source_type", "unknown"),
+                    payload.get("file_extension") or "",
+                    payload.get("page_number"),
+                )] += 1
+            if offset is None:
+                break
+        collection_stats.replace_counts(collection, counts)
+        return sum(counts.values())
+
+    def create_collection(self, collection_name: str, vector_size: int, distance: str = "Cosine", profile: Optional[Dict[str, Any]] = None, sparse: Optional[str] = None) -> None:
         """
         Create a new collection in Qdrant with the specified parameters.
 
@@ -169,6 +571,10 @@ class QdrantService:
             collection_name (str): Name of the collection to create.
             vector_size (int): Size of the vectors to be stored.
             distance (str): Distance metric to use ("Cosine", "Euclid", "Dot").
+            profile (dict): Storage profile (quantization, on-disk vectors, HNSW);
+                defaults to the collection's configured profile.
+            sparse (str): Sparse model (e.g. "Qdrant/bm25") for a hybrid collection
+                with named dense and sparse vectors; None for dense-only.
 
         Raises:
             ValueError: If collection_name or vector_size is invalid.
@@ -179,7 +585,7 @@ class QdrantService:
         if not isinstance(vector_size, int) or vector_size <= 0:
             raise ValueError("vector_size must be a positive integer.")
 
-        client = QdrantService.ensure_qdrant_ready(use_openai=True)
+        client = QdrantService.ensure_qdrant_ready()
 
         distance_map = {
             "Cosine": qmodels.Distance.COSINE,
@@ -187,26 +593,40 @@ class QdrantService:
             "Dot": qmodels.Distance.DOT
         }
         distance_enum = distance_map.get(distance, qmodels.Distance.COSINE)
+        profile = profile or collection_profile(collection_name)
 
         try:
             client.create_collection(
                 collection_name=collection_name,
-                vectors_config=qmodels.VectorParams(
-                    size=vector_size,
-                    distance=distance_enum
-                ),
+                **vector_layout(profile, vector_size, distance_enum, sparse=sparse),
                 optimizers_config=None,
                 shard_number=None,
-                on_disk_payload=None,
-                hnsw_config=None,
+                on_disk_payload=True,
+                hnsw_config=hnsw_config(profile),
                 wal_config=None,
-                quantization_config=None,
+                quantization_config=quantization_config(profile),
                 replication_factor=None,
                 write_consistency_factor=None
             )
+            _hybrid_collections[collection_name] = bool(sparse)
+            QdrantService.ensure_payload_indexes(client, collection_name)
         except Exception as e:
             raise Exception(f"Failed to create collection '{collection_name}': {str(e)}")
 
+    def update_collection_profile(self, collection_name: str, profile: Dict[str, Any]) -> None:
+        """
+        Apply a storage profile to an existing collection in place.
+
+        Qdrant rebuilds the HNSW graph and quantized vectors in the background;
+        the vector dimension cannot change this way.
+        """
+        client = QdrantService.ensure_qdrant_ready()
+        client.update_collection(
+            collection_name=collection_name,
+            vectors_config={DENSE_VECTOR_NAME if collection_is_hybrid(client, collection_name) else "": qmodels.VectorParamsDiff(on_disk=profile["on_disk"])},
+            hnsw_config=hnsw_config(profile),
+            quantization_config=quantization_config(profile) or qmodels.Disabled.DISABLED,
+        )
 
 
 qdrant_service = QdrantService(
@@ -0,0 +1,104 @@
+import json
+import asyncio
+from typing import List, Set, Optional
+
+from qdrant_client import AsyncQdrantClient, models as qmodels
+
+from const.env_variables import (
+    QDRANT_COLLECTION,
+    QDRANT_UPSERT_BATCH_POINTS,
+    QDRANT_UPSERT_BATCH_BYTES,
+    QDRANT_UPSERT_MAX_IN_FLIGHT,
+)
+
+
+def estimate_point_bytes(point: qmodels.PointStruct) -> int:
+    """Rough wire size of a point: 4 bytes per vector value plus the JSON payload."""
+    vectors = point.vector.values() if isinstance(point.vector, dict) else [point.vector]
+    values = 0
+    for vector in vectors:
+        if isinstance(vector, qmodels.SparseVector):
+            values += 2 * len(vector.values)
+        else:
+            values += len(vector)
+    return 4 * values + len(json.dumps(point.payload or {}, default=str))
+
+
+class QdrantUpsertEngine:
+    """
+    Buffers points and upserts them in size-bounded, concurrent batches.
+
+    Batches are closed at `batch_points` points or `batch_bytes` estimated
+    bytes, whichever comes first, and sent with `wait=False` so Qdrant only
+    acknowledges the WAL write; at most `max_in_flight` batches are
+    outstanding. `flush()` drains outstanding batches and then sends the last
+    buffered batch with `wait=True`. Qdrant applies writes in WAL order, so
+    once that call returns every earlier batch is applied as well.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str = QDRANT_COLLECTION,
+        batch_points: int = QDRANT_UPSERT_BATCH_POINTS,
+        batch_bytes: int = QDRANT_UPSERT_BATCH_BYTES,
+        max_in_flight: int = QDRANT_UPSERT_MAX_IN_FLIGHT,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_points = max(1, batch_points)
+        self.batch_bytes = max(1, batch_bytes)
+        self.upserted = 0
+        self._buffer: List[qmodels.PointStruct] = []
+        self._buffer_bytes = 0
+        self._semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self._tasks: Set[asyncio.Task] = set()
+        self._error: Optional[BaseException] = None
+
+    async def add(self, points: List[qmodels.PointStruct]) -> None:
+        for point in points:
+            size = estimate_point_bytes(point)
+            # Only send a batch once the next point no longer fits, so the buffer
+            # is never empty at flush time and the final write can act as barrier.
+            if self._buffer and (len(self._buffer) >= self.batch_points or self._buffer_bytes + size > self.batch_bytes):
+                await self._send(self._buffer)
+                self._buffer, self._buffer_bytes = [], 0
+            self._buffer.append(point)
+            self._buffer_bytes += size
+
+    async def flush(self) -> int:
+        """
+        Wait until every added point is applied.
+
+        Returns:
+            int: Total number of points upserted by this engine.
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._raise_error()
+        if self._buffer:
+            batch, self._buffer, self._buffer_bytes = self._buffer, [], 0
+            await self.client.upsert(collection_name=self.collection_name, points=batch, wait=True)
+            self.upserted += len(batch)
+        return self.upserted
+
+    async def _send(self, batch: List[qmodels.PointStruct]) -> None:
+        self._raise_error()
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._upsert(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _upsert(self, batch: List[qmodels.PointStruct]) -> None:
+        try:
+            await self.client.upsert(collection_name=self.collection_name, points=batch, wait=False)
+            self.upserted += len(batch)
+        except BaseException as e:
+            self._error = self._error or e
+            raise
+        finally:
+            self._semaphore.release()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Qdrant upsert failed: {str(self._error)}") from self._error
@@ -0,0 +1,160 @@
+import time
+import asyncio
+import threading
+from typing import List, Dict, Optional, Tuple, Any
+
+from sentence_transformers import CrossEncoder
+from qdrant_client import models as qmodels
+
+from helpers.query_cache import rerank_score_cache
+from const.env_variables import (
+    RERANK_MODEL,
+    RERANK_BATCH_SIZE,
+    RERANK_OVERFETCH,
+    RERANK_MAX_CANDIDATES,
+    RERANK_MAX_IN_FLIGHT,
+)
+
+
+# Factor applied to the per-pair cost estimate whenever a rerank is skipped for budget.
+BUDGET_SKIP_DECAY = 0.8
+
+
+class Reranker:
+    """
+    Reorders retrieved chunks with a local cross-encoder.
+
+    Callers over-fetch `candidates(limit)` hits, hydrate them and pass them to
+    `rerank`, which scores the (query, chunk) pairs in batched CPU inference
+    on a worker thread and keeps the best `limit`. Scores are cached per
+    (query, point id), so only unseen candidates are scored.
+
+    Reranking is skipped, keeping the retrieval order, when `max_in_flight`
+    reranks are already running or when the estimated scoring time of the
+    uncached candidates exceeds the caller's latency budget, or when scoring
+    fails. Each budget skip decays the per-pair estimate, so one slow batch
+    (e.g. the first, cold one) does not switch reranking off for good. A rerank that overruns its budget is abandoned by the caller but
+    finishes in the background and still fills the cache.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL,
+        batch_size: int = RERANK_BATCH_SIZE,
+        overfetch: int = RERANK_OVERFETCH,
+        max_candidates: int = RERANK_MAX_CANDIDATES,
+        max_in_flight: int = RERANK_MAX_IN_FLIGHT,
+    ):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.overfetch = max(1, overfetch)
+        self.max_candidates = max(1, max_candidates)
+        self.max_in_flight = max(1, max_in_flight)
+        self._model: Optional[CrossEncoder] = None
+        self._model_lock = threading.Lock()
+        self._in_flight = 0
+        self._ms_per_pair: Optional[float] = None
+        self.reranked = 0
+        self.skipped: Dict[str, int] = {}
+
+    def candidates(self, limit: int) -> int:
+        """How many hits to retrieve so that `limit` remain after reranking."""
+        return max(limit, min(limit * self.overfetch, self.max_candidates))
+
+    def _load(self) -> CrossEncoder:
+        with self._model_lock:
+            if self._model is None:
+                self._model = CrossEncoder(self.model_name, device="cpu")
+            return self._model
+
+    def warmup(self) -> None:
+        """Load the model and run one batch. Blocking; run it off the event loop."""
+        self._load().predict([("warmup", "warmup")], show_progress_bar=False)
+
+    def _score(self, query: str, pairs: List[Tuple[str, str]]) -> Dict[str, float]:
+        model = self._load()
+        started = time.perf_counter()
+        scores = model.predict(
+            [(query, text) for _, text in pairs],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        ).tolist()
+        ms_per_pair = (time.perf_counter() - started) * 1000 / len(pairs)
+        # Exponential moving average, so the budget check tracks the current machine load.
+        self._ms_per_pair = ms_per_pair if self._ms_per_pair is None else 0.8 * self._ms_per_pair + 0.2 * ms_per_pair
+        scored = {point_id: float(score) for (point_id, _), score in zip(pairs, scores)}
+        rerank_score_cache.put_many(query, self.model_name, scored)
+        return scored
+
+    def _skip(self, reason: str) -> Dict[str, Any]:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        return {"reranked": False, "skipped": reason}
+
+    def _release(self, _task: asyncio.Future) -> None:
+        self._in_flight -= 1
+
+    async def rerank(
+        self,
+        query: str,
+        hits: List[qmodels.ScoredPoint],
+        docs: List[Dict[str, Any]],
+        limit: int,
+        budget_ms: Optional[float] = None,
+    ) -> Tuple[List[qmodels.ScoredPoint], List[Dict[str, Any]], List[Optional[float]], Dict[str, Any]]:
+        """
+        Keep the `limit` best of the hydrated candidates by cross-encoder score.
+
+        Returns:
+            Tuple of (hits, docs, rerank scores, info). When reranking is
+            skipped the retrieval order is kept, the scores are None and
+            `info["skipped"]` says why.
+        """
+        started = time.perf_counter()
+        ids = [str(hit.id) for hit in hits]
+        scores = rerank_score_cache.get_many(query, self.model_name, ids)
+        missing = [(point_id, doc.get("chunk_text", "")) for point_id, doc in zip(ids, docs) if point_id not in scores]
+        info = {"candidates": len(hits), "cached": len(hits) - len(missing)}
+
+        if missing:
+            if self._in_flight >= self.max_in_flight:
+                info.update(self._skip("load"))
+            elif budget_ms is not None and self._ms_per_pair is not None and self._ms_per_pair * len(missing) > budget_ms:
+                # The estimate only moves when something is scored; decaying it
+                # lets a later request try again and measure the current cost.
+                self._ms_per_pair *= BUDGET_SKIP_DECAY
+                info.update(self._skip("budget"))
+            else:
+                self._in_flight += 1
+                task = asyncio.ensure_future(asyncio.to_thread(self._score, query, missing))
+                task.add_done_callback(self._release)
+                try:
+                    scores.update(await asyncio.wait_for(asyncio.shield(task), timeout=budget_ms / 1000 if budget_ms is not None else None))
+                except asyncio.TimeoutError:
+                    info.update(self._skip("timeout"))
+                except Exception as e:
+                    # A model that fails to load or score must not break retrieval.
+                    info.update(self._skip("error"), error=str(e))
+
+        if "skipped" in info:
+            info["ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return hits[:limit], docs[:limit], [None] * min(limit, len(hits)), info
+
+        order = sorted(range(len(hits)), key=lambda idx: scores[ids[idx]], reverse=True)[:limit]
+        self.reranked += 1
+        info.update({"reranked": True, "ms": round((time.perf_counter() - started) * 1000, 1)})
+        return [hits[idx] for idx in order], [docs[idx] for idx in order], [scores[ids[idx]] for idx in order], info
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "loaded": self._model is not None,
+            "in_flight": self._in_flight,
+            "ms_per_pair": round(self._ms_per_pair, 3) if self._ms_per_pair is not None else None,
+            "reranked": self.reranked,
+            "skipped": dict(self.skipped),
+            "cache": rerank_score_cache.stats(),
+        }
+
+
+reranker = Reranker()
@@ -0,0 +1,82 @@
+import threading
+from typing import List, Dict, Optional, Any
+
+from fastembed import SparseTextEmbedding
+from qdrant_client import models as qmodels
+
+from services.collectionSettings import collection_settings
+from const.env_variables import QDRANT_COLLECTION, QDRANT_HYBRID, SPARSE_EMBEDDING_MODEL, SPARSE_EMBED_BATCH_SIZE, FASTEMBED_CACHE_DIR
+
+_models: Dict[str, SparseTextEmbedding] = {}
+_models_lock = threading.Lock()
+
+
+def _get_model(model_name: str) -> SparseTextEmbedding:
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = _models[model_name] = SparseTextEmbedding(model_name=model_name, cache_dir=FASTEMBED_CACHE_DIR)
+        return model
+
+
+def uses_idf(model_name: str) -> bool:
+    """BM25/BM42 emit term frequencies only; Qdrant applies the IDF from collection statistics."""
+    name = model_name.lower()
+    return "bm25" in name or "bm42" in name
+
+
+def sparse_model(collection_name: Optional[str] = None) -> Optional[str]:
+    """
+    Sparse model of a hybrid collection, or None for a dense-only collection.
+
+    The default collection is hybrid when QDRANT_HYBRID is set and it has no
+    explicit setting.
+    """
+    collection = collection_name or QDRANT_COLLECTION
+    entry = collection_settings.get(collection, "sparse")
+    if entry:
+        return entry.get("model")
+    if collection == QDRANT_COLLECTION and QDRANT_HYBRID:
+        return SPARSE_EMBEDDING_MODEL
+    return None
+
+
+def assign_sparse_model(collection_name: str, model_name: Optional[str]) -> Dict[str, Any]:
+    """Record whether a collection carries sparse vectors (`model_name=None` for dense-only)."""
+    return collection_settings.set(collection_name, "sparse", {"model": model_name})
+
+
+def _to_sparse_vector(embedding) -> qmodels.SparseVector:
+    return qmodels.SparseVector(indices=embedding.indices.tolist(), values=embedding.values.tolist())
+
+
+def embed_sparse_documents(texts: List[str], model_name: str = SPARSE_EMBEDDING_MODEL) -> List[qmodels.SparseVector]:
+    """Sparse vectors for document chunks. CPU-bound; run it off the event loop."""
+    if not texts:
+        return []
+    return [_to_sparse_vector(e) for e in _get_model(model_name).embed(texts, batch_size=SPARSE_EMBED_BATCH_SIZE)]
+
+
+def embed_sparse_query(query: str, model_name: str = SPARSE_EMBEDDING_MODEL) -> qmodels.SparseVector:
+    """Sparse vector for a search query (BM25 weighs query terms differently from documents)."""
+    return _to_sparse_vector(next(iter(_get_model(model_name).query_embed(query))))
+
+
+SEARCH_MODES = ("auto", "dense", "hybrid")
+
+
+def warmup_sparse_models() -> List[str]:
+    """
+    Load the sparse model of every hybrid collection. Blocking; run it off the
+    event loop. A model that fails to load is reported and skipped, so it is
+    retried on the first hybrid query instead of preventing startup.
+    """
+    names = [QDRANT_COLLECTION] + [name for name in collection_settings.collections() if name != QDRANT_COLLECTION]
+    loaded = []
+    for model in sorted({model for model in (sparse_model(name) for name in names) if model}):
+        try:
+            embed_sparse_query("warmup", model)
+            loaded.append(model)
+        except Exception as e:
+            print(f"Sparse model '{model}' warm-up failed: {e}")
+    return loaded
@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import helpers.answer_cache as answer_cache_module
+from helpers.answer_cache import AnswerCache, answer_scope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        # Every call is a little later, so last_used orders strictly by access.
+        self.now += 0.001
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(answer_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(
+        str(tmp_path / "cache" / "answers.sqlite3"),
+        similarity=0.95,
+        ttl_seconds=3600,
+        max_entries=10,
+        scan_limit=100,
+        enabled=True,
+    )
+
+
+def _scope(checksums=("c1",), **retrieval):
+    return answer_scope("gpt", "openai/m", list(checksums), [], "judged", retrieval or None)
+
+
+def test_scope_is_order_insensitive_for_checksums_and_sensitive_to_settings():
+    assert _scope(["c1", "c2"]) == _scope(["c2", "c1", "c1"])
+    assert _scope(search_mode="auto") != _scope(search_mode="dense")
+    assert _scope(rerank=True) != _scope(rerank=False)
+    assert answer_scope("gpt", "openai/m", ["c1"], [], "fast") != answer_scope("gpt", "openai/m", ["c1"], [], "judged")
+
+
+def test_similar_question_hits_within_its_scope_only(cache):
+    scope = _scope()
+    cache.put(scope, "What is RAG?", [1.0, 0.0], ["c1"], {"answer": "retrieval"})
+
+    hit = cache.get(scope, [0.99, 0.05])
+    assert hit["response"] == {"answer": "retrieval"}
+    assert hit["query"] == "What is RAG?"
+    assert hit["similarity"] >= 0.95
+    assert cache.get(scope, [0.0, 1.0]) is None
+    assert cache.get(_scope(["c2"]), [1.0, 0.0]) is None
+
+
+def test_invalidating_a_checksum_drops_every_answer_given_from_it(cache):
+    scope_one, scope_both = _scope(["c1"]), _scope(["c1", "c2"])
+    cache.put(scope_one, "q1", [1.0, 0.0], ["c1"], "a1")
+    cache.put(scope_both, "q2", [1.0, 0.0], ["c1", "c2"], "a2")
+    cache.put(_scope(["c3"]), "q3", [1.0, 0.0], ["c3"], "a3")
+
+    assert cache.invalidate_checksums(["c2"]) == 1
+    assert cache.get(scope_both, [1.0, 0.0]) is None
+    assert cache.get(scope_one, [1.0, 0.0])["response"] == "a1"
+
+    assert cache.invalidate_checksums(["c1"]) == 1
+    assert cache.get(scope_one, [1.0, 0.0]) is None
+    assert cache.get(_scope(["c3"]), [1.0, 0.0])["response"] == "a3"
+    stats = cache.stats()
+    assert (stats["entries"], stats["invalidations"]) == (1, 2)
+
+
+def test_oldest_answers_are_evicted_past_max_entries(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), similarity=0.95, ttl_seconds=3600, max_entries=2, scan_limit=100, enabled=True)
+    for idx in range(3):
+        cache.put(_scope([f"c{idx}"]), f"q{idx}", [1.0, 0.0], [f"c{idx}"], idx)
+
+    assert cache.get(_scope(["c0"]), [1.0, 0.0]) is None
+    assert cache.get(_scope(["c2"]), [1.0, 0.0])["response"] == 2
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+
+
+def test_expired_answers_do_not_hit(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), similarity=0.95, ttl_seconds=60, max_entries=10, scan_limit=100, enabled=True)
+    cache.put(_scope(), "q", [1.0, 0.0], ["c1"], "a")
+    clock.now += 30
+    assert cache.get(_scope(), [1.0, 0.0])["response"] == "a"
+    clock.now += 31
+    assert cache.get(_scope(), [1.0, 0.0]) is None
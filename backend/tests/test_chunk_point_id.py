@@ -0,0 +1,41 @@
+import uuid
+
+import pytest
+
+# qdrantService pulls in the Qdrant client and the embedding/sparse model stacks.
+pytest.importorskip("qdrant_client")
+pytest.importorskip("fastembed")
+pytest.importorskip("sentence_transformers")
+
+from services.qdrantService import chunk_point_id, parse_storage_key
+
+CHECKSUM = "ab" * 32
+
+
+def test_point_id_is_stable_across_processes_and_releases():
+    # Pinned: changing the namespace or key format would duplicate every
+    # point on the next re-ingest instead of overwriting it.
+    assert chunk_point_id(CHECKSUM, "report.pdf", 0, 1000, 200) == "53269c33-489a-51ab-a819-ed97baad82a1"
+
+
+def test_point_id_is_a_valid_uuid_and_deterministic():
+    first = chunk_point_id(CHECKSUM, "report.pdf", 7)
+    assert uuid.UUID(first).version == 5
+    assert chunk_point_id(CHECKSUM, "report.pdf", 7) == first
+
+
+@pytest.mark.parametrize("other", [
+    (CHECKSUM, "report.pdf", 8, 1000, 200),
+    (CHECKSUM, "other.pdf", 7, 1000, 200),
+    ("cd" * 32, "report.pdf", 7, 1000, 200),
+    (CHECKSUM, "report.pdf", 7, 500, 200),
+    (CHECKSUM, "report.pdf", 7, 1000, 100),
+])
+def test_point_id_changes_with_any_part_of_the_key(other):
+    assert chunk_point_id(*other) != chunk_point_id(CHECKSUM, "report.pdf", 7, 1000, 200)
+
+
+def test_parse_storage_key():
+    assert parse_storage_key(f"ab/ab/{CHECKSUM}/report.pdf") == {"checksum": CHECKSUM, "filename": "report.pdf"}
+    with pytest.raises(ValueError):
+        parse_storage_key("report.pdf")
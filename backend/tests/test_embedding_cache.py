@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import helpers.embedding_cache as embedding_cache_module
+from helpers.embedding_cache import EmbeddingCache, text_hash
+
+
+def _rows(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "embeddings.sqlite3")
+
+
+def test_round_trip_keyed_by_text_model_and_dim(path):
+    cache = EmbeddingCache(path, max_entries=10, enabled=True)
+    cache.put_many(["alpha", "beta"], [[1.0, 2.0], [3.0, 4.0]], "openai/m", 2)
+    found = cache.get_many(["beta", "gamma", "alpha", "beta"], "openai/m", 2)
+    assert found == {0: [3.0, 4.0], 2: [1.0, 2.0], 3: [3.0, 4.0]}
+    assert cache.get_many(["alpha"], "ollama/m", 2) == {}
+    assert cache.get_many(["alpha"], "openai/m", 3) == {}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+
+
+def test_entry_counter_tracks_inserts_and_ignores_re_puts(path):
+    cache = EmbeddingCache(path, max_entries=10, enabled=True)
+    cache.put_many(["a", "b"], [[1.0], [2.0]], "m", 1)
+    cache.put_many(["a", "b", "c"], [[1.5], [2.0], [3.0]], "m", 1)
+    assert cache.stats()["entries"] == _rows(path) == 3
+    assert cache.get_many(["a"], "m", 1) == {0: [1.5]}
+
+
+def test_least_recently_used_entries_are_evicted(path, monkeypatch):
+    # Every call is one tick later, so last_used orders strictly by access.
+    ticks = [0]
+
+    def clock() -> float:
+        ticks[0] += 1
+        return float(ticks[0])
+
+    monkeypatch.setattr(embedding_cache_module.time, "time", clock)
+    cache = EmbeddingCache(path, max_entries=3, enabled=True)
+    cache.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]], "m", 1)
+    cache.get_many(["a"], "m", 1)
+    cache.put_many(["d", "e"], [[4.0], [5.0]], "m", 1)
+
+    assert set(cache.get_many(["a", "b", "c", "d", "e"], "m", 1)) == {0, 3, 4}
+    stats = cache.stats()
+    assert stats["entries"] == _rows(path) == 3
+    assert stats["evictions"] == 2
+
+
+def test_existing_cache_is_counted_on_first_connect(path):
+    EmbeddingCache(path, max_entries=10, enabled=True).put_many(["a", "b"], [[1.0], [2.0]], "m", 1)
+    with sqlite3.connect(path) as conn:
+        # A cache written before the entry counter existed.
+        conn.execute("DELETE FROM counters WHERE name = 'entries'")
+        conn.execute("INSERT INTO embeddings VALUES (?, 'm', 1, ?, 0)", (text_hash("c"), b"\x00\x00\x80?"))
+
+    cache = EmbeddingCache(path, max_entries=10, enabled=True)
+    assert cache.stats()["entries"] == 3
+    cache.put_many(["d"], [[4.0]], "m", 1)
+    assert cache.stats()["entries"] == _rows(path) == 4
+
+
+def test_disabled_cache_is_a_no_op(path):
+    cache = EmbeddingCache(path, max_entries=10, enabled=False)
+    cache.put_many(["a"], [[1.0]], "m", 1)
+    assert cache.get_many(["a"], "m", 1) == {}
+    assert cache.stats() == {"enabled": False}
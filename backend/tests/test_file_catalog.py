@@ -0,0 +1,85 @@
+import pytest
+
+import helpers.file_catalog as file_catalog_module
+from helpers.file_catalog import FileCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_catalog_module, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(file_catalog_module, "JOBS_DIR", str(tmp_path / "uploads" / ".jobs"))
+    catalog = FileCatalog(str(tmp_path / "store" / "catalog.sqlite3"))
+    files = [
+        ("a.pdf", 300, "application/pdf", "2024-01-01T00:00:00"),
+        ("b.txt", 100, "text/plain", "2024-01-03T00:00:00"),
+        ("c_1.pdf", 200, "application/pdf", "2024-01-02T00:00:00"),
+        ("c%1.txt", 50, "text/plain", "2024-01-04T00:00:00"),
+    ]
+    for idx, (filename, size, ctype, created_at) in enumerate(files):
+        checksum = f"{idx:064x}"
+        catalog.add_file(f"{checksum[:2]}/{checksum[2:4]}/{checksum}/{filename}", checksum, filename, size, ctype, created_at)
+    return catalog
+
+
+def _names(items):
+    return [item["filename"] for item in items]
+
+
+def test_default_order_is_newest_first(catalog):
+    total, items = catalog.list_files()
+    assert total == 4
+    assert _names(items) == ["c%1.txt", "b.txt", "c_1.pdf", "a.pdf"]
+
+
+def test_sort_by_column_and_direction(catalog):
+    _, items = catalog.list_files(sort_by="size_bytes", descending=False)
+    assert _names(items) == ["c%1.txt", "b.txt", "c_1.pdf", "a.pdf"]
+    _, items = catalog.list_files(sort_by="filename", descending=False)
+    assert _names(items) == ["a.pdf", "b.txt", "c%1.txt", "c_1.pdf"]
+
+
+def test_unknown_sort_column_is_rejected(catalog):
+    with pytest.raises(ValueError):
+        catalog.list_files(sort_by="size_bytes; DROP TABLE files")
+
+
+def test_pagination_reports_the_full_total(catalog):
+    total, first = catalog.list_files(limit=3, offset=0, sort_by="filename", descending=False)
+    _, rest = catalog.list_files(limit=3, offset=3, sort_by="filename", descending=False)
+    assert total == 4
+    assert _names(first) == ["a.pdf", "b.txt", "c%1.txt"]
+    assert _names(rest) == ["c_1.pdf"]
+
+
+def test_filename_filter_treats_wildcards_literally(catalog):
+    assert _names(catalog.list_files(filename="c_")[1]) == ["c_1.pdf"]
+    assert _names(catalog.list_files(filename="c%")[1]) == ["c%1.txt"]
+    assert catalog.list_files(filename="pdf")[0] == 2
+
+
+def test_content_type_and_checksum_filters(catalog):
+    total, items = catalog.list_files(content_type="text/plain", sort_by="filename", descending=False)
+    assert total == 2
+    assert _names(items) == ["b.txt", "c%1.txt"]
+    assert _names(catalog.list_files(checksum=f"{0:064x}")[1]) == ["a.pdf"]
+
+
+def test_job_links_follow_the_newest_job(catalog):
+    _, items = catalog.list_files(sort_by="filename", descending=False)
+    keys = [item["storage_key"] for item in items[:2]]
+    catalog.link_job("old", keys, "queued")
+    catalog.link_job("new", keys[:1], "queued")
+    # The older job finishing late must not overwrite the newer job's link.
+    catalog.link_job("old", keys, "completed")
+
+    total, items = catalog.list_files(job_status="completed")
+    assert total == 1
+    assert items[0]["storage_key"] == keys[1]
+    _, items = catalog.list_files(job_status="queued")
+    assert [(item["storage_key"], item["job_id"]) for item in items] == [(keys[0], "new")]
+
+
+def test_remove_file(catalog):
+    assert catalog.remove_file(f"{1:064x}", "b.txt")
+    assert not catalog.remove_file(f"{1:064x}", "b.txt")
+    assert catalog.list_files()[0] == 3
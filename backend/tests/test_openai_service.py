@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+import services.openAiService as openai_service_module
+from services.openAiService import OpenAIService
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setattr(openai_service_module, "OPENAI_API_KEY", "test-key")
+
+
+class FakeResponses:
+    """Stands in for `client.responses`, recording how many calls overlap."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return kwargs["input"]
+
+
+def test_client_is_shared_within_a_loop():
+    service = OpenAIService()
+
+    async def clients():
+        return service.service, service.service
+
+    first, second = asyncio.run(clients())
+    assert first is second
+
+
+def test_concurrent_requests_are_capped():
+    service = OpenAIService(max_concurrent_requests=2)
+    responses = FakeResponses()
+
+    async def run():
+        service.service.responses = responses
+        return await asyncio.gather(*(service.query_model([{"role": "user", "content": str(idx)}]) for idx in range(6)))
+
+    results = asyncio.run(run())
+    assert len(results) == 6
+    assert responses.peak == 2
+
+
+def test_client_from_another_loop_is_replaced_and_closed_on_its_loop():
+    service = OpenAIService()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def client():
+            return service.service
+
+        old = asyncio.run_coroutine_threadsafe(client(), loop).result(timeout=5)
+        new = asyncio.run(client())
+        assert new is not old
+
+        async def closed():
+            # Runs on the old loop after the close it scheduled there.
+            for _ in range(100):
+                if old.is_closed():
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+
+        assert asyncio.run_coroutine_threadsafe(closed(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
@@ -0,0 +1,38 @@
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from helpers import parse_helper
+from helpers.parse_helper import ParseError, iter_chunks_parallel
+
+
+def _chunk_or_hang(abs_path, chunk_size, overlap):
+    # Runs in a spawned parse worker, so it must be importable from this module.
+    if "hang" in abs_path:
+        time.sleep(60)
+    time.sleep(2)
+    return [{"text": abs_path, "metadata": {}}]
+
+
+async def _collect(abs_path, timeout):
+    return [chunk async for chunk in iter_chunks_parallel(abs_path, timeout=timeout)]
+
+
+def test_hanging_file_does_not_fail_file_parsed_alongside(monkeypatch):
+    monkeypatch.setattr(parse_helper, "PARSE_WORKERS", 2)
+    monkeypatch.setattr(parse_helper, "chunk_file", _chunk_or_hang)
+
+    async def run():
+        return await asyncio.gather(
+            _collect("/tmp/hang.txt", timeout=1),
+            _collect("/tmp/good.txt", timeout=30),
+            return_exceptions=True,
+        )
+
+    hung, good = asyncio.run(run())
+
+    assert isinstance(hung, ParseError)
+    assert good == [{"text": "/tmp/good.txt", "metadata": {}}]
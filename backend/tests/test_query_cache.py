@@ -0,0 +1,61 @@
+import helpers.query_cache as query_cache_module
+from helpers.query_cache import QueryEmbeddingCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache_module.time, "monotonic", clock)
+    return QueryEmbeddingCache(**kwargs), clock
+
+
+def test_normalize_query_folds_case_whitespace_and_unicode_forms():
+    assert normalize_query("  Ｈello \t World\n") == "hello world"
+    assert normalize_query("STRASSE") == normalize_query("straße")
+
+
+def test_hit_uses_normalized_query_and_model(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=10, ttl_seconds=60)
+    cache.put("Hello  world", "openai/m", [1.0, 2.0])
+    assert cache.get("hello world", "openai/m") == [1.0, 2.0]
+    assert cache.get("hello world", "ollama/m") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch, max_entries=10, ttl_seconds=60)
+    cache.put("q", "m", [1.0])
+    clock.now += 60
+    assert cache.get("q", "m") == [1.0]
+    clock.now += 1
+    assert cache.get("q", "m") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["expired"], stats["misses"]) == (0, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=2, ttl_seconds=60)
+    cache.put("a", "m", [1.0])
+    cache.put("b", "m", [2.0])
+    assert cache.get("a", "m") == [1.0]
+    cache.put("c", "m", [3.0])
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") == [1.0]
+    assert cache.get("c", "m") == [3.0]
+    assert cache.stats()["entries"] == 2
+
+
+def test_put_refreshes_an_existing_entry(monkeypatch):
+    cache, clock = _cache(monkeypatch, max_entries=10, ttl_seconds=60)
+    cache.put("q", "m", [1.0])
+    clock.now += 50
+    cache.put("q", "m", [2.0])
+    clock.now += 50
+    assert cache.get("q", "m") == [2.0]